@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import functools
+import os
+import time
+import tracemalloc
+
+from helpers import intraday, replicate
+
+
+def parse_size(text):
+
+    text = text.strip().upper()
+    for suffix, mult in (('K', 10 ** 3), ('M', 10 ** 6)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * mult)
+
+    return int(text)
+
+
+def sizes(default='10k,100k'):
+
+    return [parse_size(s) for s in os.environ.get('TSF_BENCH_SIZES', default).split(',')]
+
+
+def size_id(n):
+
+    for suffix, mult in (('M', 10 ** 6), ('k', 10 ** 3)):
+        if n >= mult and n % mult == 0:
+            return '%d%s' % (n // mult, suffix)
+
+    return str(n)
+
+
+# the original implementation computes the levels and volumes group by
+# group over the whole frame, in O(groups x rows): 27 s on 10k daily rows,
+# hours on a million, so it only runs up to TSF_BENCH_BASELINE_MAX rows
+baseline_max = parse_size(os.environ.get('TSF_BENCH_BASELINE_MAX', '10k'))
+
+
+@functools.lru_cache(maxsize=2)
+def bars(freq, n_rows):
+
+    return replicate(n_rows) if freq == 'daily' else intraday(n_rows)
+
+
+def peak_memory(func, *args):
+
+    # peak of the memory allocated while running func, in MB
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def best_time(func, *args, repeat=3):
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def run(benchmark, func, ts, memory=True):
+
+    # one round on the large sizes, the rows per second and the peak memory
+    # are kept in the extra info of the benchmark
+    rounds = 3 if len(ts) <= 100_000 else 1
+    benchmark.pedantic(func, args=(ts,), rounds=rounds, iterations=1)
+    benchmark.extra_info['rows'] = len(ts)
+    benchmark.extra_info['rows_per_second'] = len(ts) / benchmark.stats.stats.min
+    if memory:
+        benchmark.extra_info['peak_mb'] = peak_memory(func, ts)
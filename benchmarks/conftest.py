@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+r"""
+Benchmarks of ``tsf_vectorizer``, run with pytest-benchmark::
+
+    python -m pytest benchmarks
+    TSF_BENCH_SIZES=10k,100k,1M,10M python -m pytest benchmarks --benchmark-json=bench.json
+
+``TSF_BENCH_SIZES`` sets the numbers of rows (10k and 100k by default, the
+larger sizes take minutes). Daily data is the soybean series of the tests
+repeated back in time, minute data every daily bar split into minute bars.
+
+"""
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(here), 'tests'))
+sys.path.insert(0, here)
+
+from helpers import root  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def baseline(tmp_path_factory):
+
+    # tsf_vectorizer of the first commit (or of TSF_BENCH_BASELINE)
+    pytest.importorskip('pymannkendall')
+    rev = os.environ.get('TSF_BENCH_BASELINE')
+    if rev is None:
+        rev = subprocess.run(['git', 'rev-list', '--max-parents=0', 'HEAD'], cwd=root,
+                             capture_output=True, text=True).stdout.split()[-1:]
+        rev = rev[0] if rev else 'HEAD'
+    source = subprocess.run(['git', 'show', rev + ':ts_features/_model.py'], cwd=root,
+                            capture_output=True, text=True)
+    if source.returncode:
+        pytest.skip("baseline not found: %s" % source.stderr.strip())
+
+    path = tmp_path_factory.mktemp('baseline') / 'ts_features_baseline.py'
+    path.write_text(source.stdout)
+    spec = importlib.util.spec_from_file_location('ts_features_baseline', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module.tsf_vectorizer
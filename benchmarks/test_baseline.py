@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import pytest
+
+from bench_helpers import bars, baseline_max, run, size_id, sizes
+from helpers import assert_same
+from ts_features import tsf_vectorizer
+
+pytest.importorskip('pytest_benchmark')
+
+params = {'trends': False, 'seas': False}
+
+
+@pytest.mark.parametrize('n_rows', sizes('10k,1M'), ids=size_id)
+@pytest.mark.parametrize('version', ['baseline', 'current'])
+def test_levels_and_volumes(benchmark, baseline, version, n_rows):
+
+    # the stages of the group-broadcast engine: levels and volumes
+    benchmark.group = 'levels-volumes-%s' % size_id(n_rows)
+    ts = bars('daily', n_rows)
+
+    if version == 'current':
+        run(benchmark, tsf_vectorizer(**params).fit_transform, ts, memory=False)
+        return
+
+    if n_rows > baseline_max:
+        pytest.skip("the baseline is quadratic, above TSF_BENCH_BASELINE_MAX=%s rows" % size_id(baseline_max))
+
+    # the baseline writes its columns into the frame it gets
+    tsf = baseline(**params)
+    out = benchmark.pedantic(lambda: tsf.fit_transform(ts.copy()), rounds=1, iterations=1)
+    benchmark.extra_info['rows_per_second'] = n_rows / benchmark.stats.stats.min
+
+    assert_same(out, tsf_vectorizer(**params).fit_transform(ts))
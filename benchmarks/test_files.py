@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import json
+import subprocess
+import sys
+
+import pytest
+
+from bench_helpers import bars, size_id, sizes
+from helpers import root
+
+pytest.importorskip('pytest_benchmark')
+pytest.importorskip('resource')
+
+# each run is a process of its own, for its peak resident memory
+script = r'''
+import json, resource, sys, time
+import pandas as pd
+from ts_features import tsf_vectorizer
+
+path, source, dest = sys.argv[1:]
+start = time.perf_counter()
+if path == 'memory':
+    ts = pd.read_parquet(source) if source.endswith('.parquet') else pd.read_csv(source)
+    out = tsf_vectorizer().fit_transform(ts)
+    out.to_parquet(dest)
+    rows = len(out)
+else:
+    rows = tsf_vectorizer().transform_file(source, dest, chunksize=100000)
+print(json.dumps({'rows': rows, 'seconds': time.perf_counter() - start,
+                  'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+'''
+
+
+@pytest.fixture(scope='module', params=sizes('100k,1M'), ids=size_id)
+def source(request, tmp_path_factory):
+
+    # minute bars written once per size, as CSV and as Parquet
+    ts = bars('minute', request.param)
+    folder = tmp_path_factory.mktemp('bars')
+    files = {'csv': str(folder / 'bars.csv')}
+    ts.to_csv(files['csv'], index=False)
+    try:
+        files['parquet'] = str(folder / 'bars.parquet')
+        ts.to_parquet(files['parquet'], index=False)
+    except ImportError:
+        del files['parquet']
+
+    return len(ts), files
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet'])
+@pytest.mark.parametrize('path', ['memory', 'file'])
+def test_out_of_core(benchmark, source, path, fmt, tmp_path):
+
+    # transform_file against read, fit_transform and write in memory
+    n_rows, files = source
+    if fmt not in files:
+        pytest.skip("pyarrow is not installed")
+    benchmark.group = 'files-%s-%s' % (fmt, size_id(n_rows))
+
+    def transform():
+        out = subprocess.run([sys.executable, '-c', script, path, files[fmt], str(tmp_path / 'out.parquet')],
+                             cwd=root, capture_output=True, text=True, check=True)
+        return json.loads(out.stdout)
+
+    stats = benchmark.pedantic(transform, rounds=1, iterations=1)
+    assert stats['rows'] == n_rows
+    benchmark.extra_info['rows_per_second'] = n_rows / stats['seconds']
+    benchmark.extra_info['peak_rss_mb'] = stats['peak_rss_mb']
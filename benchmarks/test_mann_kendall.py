@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import functools
+import math
+import os
+
+import numpy as np
+import pytest
+
+from bench_helpers import best_time, size_id, sizes
+from ts_features._kernels import get_backend, mk_batch
+
+pytest.importorskip('pytest_benchmark')
+
+max_exponent = float(os.environ.get('TSF_BENCH_MAX_EXPONENT', 1.25))
+
+
+def kernels_of(backend):
+
+    if backend == 'numba':
+        pytest.importorskip('ts_features._numba')
+
+    return get_backend(backend)
+
+
+def group(n_points):
+
+    # a random walk on a tick of 0.25: one group with many ties
+    rng = np.random.default_rng(0)
+
+    return 1000 + np.cumsum(rng.integers(-2, 3, n_points)) * 0.25
+
+
+@pytest.mark.parametrize('n_points', sizes('10k,100k,1M'), ids=size_id)
+@pytest.mark.parametrize('backend', ['numpy', 'numba'])
+def test_one_group(benchmark, backend, n_points):
+
+    # S of a single group of n_points, by counting inversions
+    benchmark.group = 'mk_batch-%s' % size_id(n_points)
+    x, offsets, kernels = group(n_points), np.array([0, n_points]), kernels_of(backend)
+    mk_batch(x[:1000], [0, 1000], backend=kernels)
+
+    benchmark.pedantic(mk_batch, args=(x, offsets), kwargs={'backend': kernels}, rounds=3, iterations=1)
+    benchmark.extra_info['points_per_second'] = n_points / benchmark.stats.stats.min
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'numba'])
+def test_scaling(backend):
+
+    # O(n log n) with Numba, O(n log² n) with NumPy: from 10k to 1M points,
+    # the exponent stays near 1
+    n_points = sorted(set(sizes('10k,100k,1M')))
+    run = functools.partial(mk_batch, backend=kernels_of(backend))
+    run(group(1000), [0, 1000])
+
+    times = [best_time(run, group(n), [0, n]) for n in n_points]
+    for (n0, t0), (n1, t1) in zip(zip(n_points, times), zip(n_points[1:], times[1:])):
+        exponent = math.log(t1 / t0) / math.log(n1 / n0)
+        assert exponent < max_exponent, (
+            "mk_batch scales super-linearly from %s to %s points: %.3fs -> %.3fs (n ** %.2f)"
+            % (size_id(n0), size_id(n1), t0, t1, exponent))
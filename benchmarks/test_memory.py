@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import os
+
+import numpy as np
+import pytest
+
+from bench_helpers import bars, baseline_max, peak_memory, size_id, sizes
+from ts_features import tsf_vectorizer
+
+pytest.importorskip('pytest_benchmark')
+
+# peak memory of fit_transform, traced with tracemalloc, over the size of
+# the frame it returns (the input columns it shares included): the features
+# are the only large allocation left, the frame is assembled without copies;
+# about 1 MB (calendar, group index) does not depend on the size
+max_ratio = float(os.environ.get('TSF_BENCH_MAX_MEMORY', '1.5'))
+overhead_mb = 2
+
+
+def output_mb(out):
+
+    return out.memory_usage(index=True).sum() / 2 ** 20
+
+
+@pytest.mark.parametrize('n_rows', sizes(), ids=size_id)
+@pytest.mark.parametrize('dtype', ['float64', 'float32'])
+@pytest.mark.parametrize('steps', ['wmsy', 'y'])
+def test_peak_memory(benchmark, steps, dtype, n_rows):
+
+    benchmark.group = 'memory-%s' % size_id(n_rows)
+    ts = bars('daily', n_rows)
+    tsf = tsf_vectorizer(steps=steps, dtype=np.dtype(dtype))
+
+    out = benchmark.pedantic(tsf.fit_transform, args=(ts,), rounds=1, iterations=1)
+    peak = peak_memory(tsf.fit_transform, ts)
+    benchmark.extra_info['peak_mb'] = peak
+    benchmark.extra_info['output_mb'] = output_mb(out)
+
+    assert peak < max_ratio * output_mb(out) + overhead_mb
+
+
+@pytest.mark.parametrize('n_rows', sizes(), ids=size_id)
+def test_peak_memory_baseline(benchmark, baseline, n_rows):
+
+    # the original implementation, on the levels, volumes and yearly trends
+    if n_rows > baseline_max:
+        pytest.skip("the baseline is quadratic, above TSF_BENCH_BASELINE_MAX=%s rows" % size_id(baseline_max))
+
+    benchmark.group = 'memory-%s' % size_id(n_rows)
+    ts = bars('daily', n_rows)
+    old = baseline(steps='y')
+
+    # the baseline writes its columns into the frame it gets: the copy is
+    # made before the tracing
+    benchmark.pedantic(lambda: old.fit_transform(ts.copy()), rounds=1, iterations=1)
+    before = peak_memory(old.fit_transform, ts.copy())
+    after = peak_memory(tsf_vectorizer(steps='y').fit_transform, ts)
+    benchmark.extra_info['peak_mb'] = before
+    benchmark.extra_info['current_peak_mb'] = after
+
+    assert after <= before
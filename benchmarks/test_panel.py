@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import functools
+import os
+
+import pandas as pd
+import pytest
+
+from bench_helpers import run
+from helpers import load_soybean
+from ts_features import tsf_vectorizer
+
+pytest.importorskip('pytest_benchmark')
+
+# TSF_BENCH_SYMBOLS copies of the soybean series, TSF_BENCH_WORKERS workers
+n_symbols = int(os.environ.get('TSF_BENCH_SYMBOLS', 16))
+workers = [int(n) for n in os.environ.get('TSF_BENCH_WORKERS', '1,2,4').split(',')]
+
+
+@pytest.fixture(scope='module')
+def panel():
+
+    base = load_soybean()
+
+    return pd.concat([base.assign(Symbol='S%03d' % k, Close=base['Close'] + k) for k in range(n_symbols)],
+                     ignore_index=True)
+
+
+@pytest.mark.parametrize('n_jobs', workers)
+@pytest.mark.parametrize('executor', ['process', 'thread'])
+def test_panel(benchmark, panel, executor, n_jobs):
+
+    # rows per second of the whole panel against the number of workers
+    benchmark.group = 'panel-%s' % executor
+    transform = functools.partial(tsf_vectorizer().fit_transform_panel, n_jobs=n_jobs, executor=executor)
+    run(benchmark, transform, panel, memory=False)
+    benchmark.extra_info['workers'] = n_jobs
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import pytest
+
+from bench_helpers import bars, run, size_id, sizes
+from helpers import assert_same
+from ts_features import tsf_vectorizer
+
+pytest.importorskip('pytest_benchmark')
+pl = pytest.importorskip('polars')
+
+
+@pytest.mark.parametrize('n_rows', sizes(), ids=size_id)
+@pytest.mark.parametrize('frame', ['pandas', 'polars', 'arrow'])
+@pytest.mark.parametrize('feature', ['perc', 'label'])
+def test_polars(benchmark, feature, frame, n_rows):
+
+    # fit_transform of the soybean series repeated back in time, as a pandas
+    # frame, a polars frame and an arrow table (converted before timing)
+    benchmark.group = 'polars-%s-%s' % (feature, size_id(n_rows))
+    ts = bars('daily', n_rows)
+    tsf = tsf_vectorizer(feature=feature)
+    data = ts if frame == 'pandas' else pl.from_pandas(ts)
+    data = data.to_arrow() if frame == 'arrow' else data
+
+    run(benchmark, tsf.fit_transform, data, memory=False)
+
+    if frame != 'pandas':
+        out = tsf.fit_transform(data)
+        assert_same((out if frame == 'polars' else pl.from_arrow(out)).to_pandas(), tsf.fit_transform(ts))
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import math
+import os
+
+import pytest
+
+from bench_helpers import bars, best_time, run, size_id, sizes
+from ts_features import tsf_vectorizer
+
+pytest.importorskip('pytest_benchmark')
+
+all_steps = ('wmsy', 'wmy', 'my', 'm', 'y')
+features = ('perc', 'value', 'label')
+freqs = ('daily', 'minute')
+
+# exponent of the running time in the number of rows above which the
+# scaling is taken as super-linear
+max_exponent = float(os.environ.get('TSF_BENCH_MAX_EXPONENT', 1.25))
+
+
+@pytest.mark.parametrize('n_rows', sizes(), ids=size_id)
+@pytest.mark.parametrize('freq', freqs)
+@pytest.mark.parametrize('steps', all_steps)
+@pytest.mark.parametrize('feature', features)
+def test_fit_transform(benchmark, feature, steps, freq, n_rows):
+
+    benchmark.group = 'fit_transform-%s-%s' % (freq, size_id(n_rows))
+    tsf = tsf_vectorizer(feature=feature, steps=steps)
+    run(benchmark, tsf.fit_transform, bars(freq, n_rows))
+
+
+@pytest.mark.parametrize('n_rows', sizes(), ids=size_id)
+@pytest.mark.parametrize('freq', freqs)
+@pytest.mark.parametrize('steps', all_steps)
+def test_extract_label(benchmark, steps, freq, n_rows):
+
+    benchmark.group = 'extract_label-%s-%s' % (freq, size_id(n_rows))
+    tsf = tsf_vectorizer(steps=steps)
+    run(benchmark, tsf.extract_label, bars(freq, n_rows))
+
+
+@pytest.mark.parametrize('freq', freqs)
+@pytest.mark.parametrize('steps', all_steps)
+def test_scaling(steps, freq):
+
+    # the time grows linearly with the rows: between two sizes, the fitted
+    # exponent of t ~ n ** k must stay below max_exponent
+    n_rows = sorted(set(sizes()))
+    if len(n_rows) < 2:
+        pytest.skip("needs two sizes")
+
+    tsf = tsf_vectorizer(steps=steps)
+    times = [best_time(tsf.fit_transform, bars(freq, n)) for n in n_rows]
+    for (n0, t0), (n1, t1) in zip(zip(n_rows, times), zip(n_rows[1:], times[1:])):
+        exponent = math.log(t1 / t0) / math.log(n1 / n0)
+        assert exponent < max_exponent, (
+            "fit_transform scales super-linearly from %s to %s rows: %.2fs -> %.2fs (n ** %.2f)"
+            % (size_id(n0), size_id(n1), t0, t1, exponent))
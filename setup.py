@@ -4,7 +4,7 @@ setup(
     name="ts_features",
     packages=find_packages(exclude=["notebooks", "docs"]),
     version='beta',
-    author='Ivan José dos Reis Filho,
+    author='Ivan José dos Reis Filho',
     author_email='ivan.filho@uemg.br',
     description='Module for extracting time series data components.',
     long_description_content_type='text/markdown',
@@ -21,11 +21,10 @@ setup(
         "Operating System :: POSIX",
         "Operating System :: Unix",
         "Operating System :: MacOS",
-        "Programming Language :: Python :: 3.7",
-        "Programming Language :: Python :: 3.6",
-        "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
-        "Programming Language :: Python :: 3.10"
+        "Programming Language :: Python :: 3.10",
+        "Programming Language :: Python :: 3.11",
+        "Programming Language :: Python :: 3.12"
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.9',
 )
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import pytest
+
+from helpers import load_soybean
+
+
+@pytest.fixture(scope='session')
+def soybean():
+
+    return load_soybean()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import os
+
+import numpy as np
+import pandas as pd
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+dataset = os.path.join(root, 'dataset', 'soja_cbot.csv')
+
+
+def load_soybean():
+
+    # as in the README: dates parsed and sorted, keeping the whole years
+    # (the original implementation fails on a year of a single row)
+    df = pd.read_csv(dataset)
+    df['Date'] = pd.to_datetime(df['Date'])
+    df.sort_values(by='Date', inplace=True)
+    df = df[(df['Date'] > '2015-01-01') & (df['Date'] < '2023-01-01')]
+    df.reset_index(drop=True, inplace=True)
+
+    return df
+
+
+def golden_configs():
+
+    # (name, parameters) of every output kept in tests/data/golden.npz
+    out = []
+    for feature in ('perc', 'value', 'label'):
+        for steps in ('wmsy', 'wmy', 'my', 'm', 'y'):
+            for mult in (True, False):
+                out.append(('%s-%s-%s' % (feature, steps, 'mult' if mult else 'uni'),
+                            {'feature': feature, 'steps': steps, 'mult': mult}))
+    for steps in ('wmsy', 'my', 'y'):
+        out.append(('extract_label-' + steps, {'steps': steps}))
+
+    return out
+
+
+def replicate(n_rows):
+
+    # daily bars: copies of the soybean series shifted back 8 years each
+    base = load_soybean()
+    parts, k = [], 0
+    while sum(map(len, parts)) < n_rows:
+        part = base.copy()
+        part['Date'] = part['Date'] - pd.DateOffset(years=8 * k)
+        parts.insert(0, part)
+        k += 1
+
+    return pd.concat(parts, ignore_index=True).tail(n_rows).reset_index(drop=True)
+
+
+def intraday(n_rows, seed=0):
+
+    # minute bars: every daily bar split into k bars with a small random walk,
+    # at most one per minute of the day
+    base = load_soybean()
+    if n_rows > 1440 * len(base):
+        base = replicate(-(-n_rows // 1440))
+    k = max(1, -(-n_rows // len(base)))
+    rng = np.random.default_rng(seed)
+
+    df = base.loc[base.index.repeat(k)].reset_index(drop=True)
+    df['Date'] = df['Date'] + pd.to_timedelta(np.tile(np.arange(k), len(base)), unit='min')
+    for c in ('Close', 'Open', 'High', 'Low'):
+        df[c] = df[c] + rng.integers(-8, 9, len(df)) * 0.25
+
+    return df.head(n_rows)
+
+
+def assert_same(a, b):
+
+    # same columns, dtypes aside, and exactly the same values
+    a, b = a.reset_index(drop=True), b.reset_index(drop=True)
+    a.columns, b.columns = list(a.columns), list(b.columns)
+    pd.testing.assert_frame_equal(a, b, check_exact=True, check_dtype=False)
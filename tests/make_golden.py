@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+r"""
+Write the golden outputs of ``tsf_vectorizer`` on ``dataset/soja_cbot.csv``.
+
+The fixture holds the outputs of the original implementation (the
+``baseline`` commit), which every optimization must reproduce exactly::
+
+    git worktree add /tmp/baseline <baseline commit>
+    python tests/make_golden.py /tmp/baseline tests/data/golden.npz
+
+"""
+import json
+import sys
+
+import numpy as np
+
+
+def main(root, dest):
+
+    sys.path.insert(0, root)
+    from ts_features import tsf_vectorizer
+
+    sys.path.insert(0, __file__.rsplit('/', 1)[0])
+    from helpers import golden_configs, load_soybean
+
+    arrays, meta = {}, {}
+    for i, (name, params) in enumerate(golden_configs()):
+        ts = load_soybean()
+        if name.startswith('extract_label'):
+            out = tsf_vectorizer(**params).extract_label(ts)
+        else:
+            out = tsf_vectorizer(**params).fit_transform(ts)
+        meta[name] = [str(c) for c in out.columns]
+        for j, c in enumerate(out.columns):
+            values = out[c].to_numpy()
+            if c == 'Date':
+                values = values.astype('datetime64[ns]')
+            arrays['%d/%d' % (i, j)] = values.astype(np.float64) if values.dtype != 'datetime64[ns]' else values
+        print(name, out.shape, flush=True)
+
+    np.savez_compressed(dest, meta=np.array(json.dumps(meta)), **arrays)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], sys.argv[2])
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import builtins
+
+import numpy as np
+import pytest
+
+from helpers import assert_same, golden_configs, intraday
+from ts_features import _kernels, tsf_vectorizer
+from ts_features._kernels import get_backend
+
+numba_backend = pytest.importorskip('ts_features._numba')
+configs = [(n, p) for n, p in golden_configs() if not n.startswith('extract_label')]
+
+
+def segments(seed, large=False):
+
+    # groups of every size, empty ones included, with ties and gaps
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(0, 1500 if large else 60, rng.integers(1, 30))
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    x = rng.integers(0, rng.integers(1, 50), offsets[-1]).astype(np.float64) * 0.25
+    x[rng.random(len(x)) < 0.1] = np.nan
+
+    return x, offsets
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('large', [False, True])
+def test_kernels(seed, large):
+
+    x, offsets = segments(seed, large)
+
+    np.testing.assert_array_equal(numba_backend.group_mean(x, offsets), _kernels.group_mean(x, offsets))
+    for a, b in zip(numba_backend.mk_stats(x, offsets), _kernels.mk_stats(x, offsets)):
+        np.testing.assert_array_equal(a, b)
+
+    trend = np.random.default_rng(seed).integers(-1, 2, (12, 30)).astype(np.float64)
+    np.testing.assert_array_equal(_kernels.seasonality(trend, numba_backend), _kernels.seasonality(trend))
+
+
+@pytest.mark.parametrize('name,params', configs, ids=[n for n, _ in configs])
+def test_daily(soybean, name, params):
+
+    assert_same(tsf_vectorizer(backend='numba', **params).fit_transform(soybean),
+                tsf_vectorizer(backend='numpy', **params).fit_transform(soybean))
+
+
+@pytest.mark.parametrize('params', [{}, {'feature': 'label'}, {'steps': 'my', 'mult': False},
+                                    {'windows': (21,), 'base_freq': 'D'}])
+def test_minute(params):
+
+    # yearly groups of minute bars are above mk_sort_size
+    ts = intraday(50000)
+
+    assert_same(tsf_vectorizer(backend='numba', **params).fit_transform(ts),
+                tsf_vectorizer(backend='numpy', **params).fit_transform(ts))
+
+
+def test_fallback(monkeypatch):
+
+    # without numba, the numpy backend is used, with a warning
+    real_import = builtins.__import__
+
+    def no_numba(name, globals=None, locals=None, fromlist=(), level=0):
+        if name == 'ts_features' and fromlist and '_numba' in fromlist:
+            raise ImportError(name)
+        return real_import(name, globals, locals, fromlist, level)
+
+    monkeypatch.setattr(builtins, '__import__', no_numba)
+    with pytest.warns(UserWarning, match="Numba is not installed"):
+        assert get_backend('numba') is _kernels
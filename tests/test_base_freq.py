@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import numpy as np
+import pytest
+
+from helpers import assert_same, intraday
+from ts_features import tsf_vectorizer
+
+calendar_prefixes = ('lvl_', 'vol_', 'trd_', 'seas_')
+
+
+@pytest.mark.parametrize('feature', ['perc', 'value', 'label'])
+def test_daily_bars(soybean, feature):
+
+    # one bar per day: resampling to days changes nothing, missing volumes
+    # included
+    assert soybean['Volume'].isna().any()
+
+    assert_same(tsf_vectorizer(feature=feature, base_freq='D').fit_transform(soybean),
+                tsf_vectorizer(feature=feature).fit_transform(soybean))
+
+
+@pytest.mark.parametrize('params', [{}, {'mult': False}, {'feature': 'label'}, {'windows': (5, 21)},
+                                    {'steps': 'my', 'feature': 'value'}])
+def test_minute_bars(params):
+
+    # the calendar features are those of the daily bars, the other features
+    # those of the minute bars
+    ts = intraday(20000)
+    ts.loc[100:400, 'Volume'] = np.nan
+
+    tsf = tsf_vectorizer(base_freq='D', **params)
+    out = tsf.fit_transform(ts)
+    daily, bars = tsf.resample(ts)
+    by_day = tsf_vectorizer(**params).fit_transform(daily)
+    by_minute = tsf_vectorizer(**params).fit_transform(ts)
+
+    assert list(out.columns) == list(by_minute.columns)
+    for c in out.columns:
+        if c.startswith(calendar_prefixes):
+            np.testing.assert_array_equal(out[c].to_numpy(), by_day[c].to_numpy()[bars])
+        else:
+            np.testing.assert_array_equal(out[c].to_numpy(), by_minute[c].to_numpy())
+
+
+def test_resample_missing_volume(soybean):
+
+    ts = soybean.head(3).copy()
+    ts['Volume'] = [np.nan, np.nan, 5.0]
+    daily, bars = tsf_vectorizer(base_freq='D').resample(ts)
+
+    assert np.isnan(daily['Volume'][:2]).all() and daily['Volume'][2] == 5.0
+    assert list(bars) == [0, 1, 2]
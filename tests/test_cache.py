@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import os
+
+import numpy as np
+import pytest
+
+from helpers import assert_same
+from ts_features import tsf_vectorizer
+from ts_features._cache import FeatureCache
+
+# stages cached by the default parameters, and blocks of the soybean series
+# (the closed years 2015 to 2021 and the open year 2022)
+n_stages = 6
+n_blocks = 2
+
+
+def test_stats(soybean, tmp_path):
+
+    tsf = tsf_vectorizer(cache=str(tmp_path))
+    cold = tsf.fit_transform(soybean)
+    assert tsf.cache_stats_ == {'hits': 0, 'misses': n_stages * n_blocks, 'evictions': 0,
+                                'entries': n_stages * n_blocks, 'bytes': tsf.cache_stats_['bytes']}
+
+    warm = tsf.fit_transform(soybean)
+    assert tsf.cache_stats_['hits'] == n_stages * n_blocks
+    assert tsf.cache_stats_['entries'] == n_stages * n_blocks
+    assert_same(warm, cold)
+
+
+def test_disabled():
+
+    with pytest.raises(ValueError):
+        tsf_vectorizer().cache_stats_
+
+
+def test_append(soybean, tmp_path):
+
+    # rows appended to the last year only recompute the open year
+    tsf = tsf_vectorizer(cache=str(tmp_path))
+    tsf.fit_transform(soybean.head(len(soybean) - 100))
+    out = tsf.fit_transform(soybean)
+
+    assert tsf.cache_stats_['hits'] == n_stages
+    assert tsf.cache_stats_['misses'] == 2 * n_stages * n_blocks - n_stages
+    assert_same(out, tsf_vectorizer().fit_transform(soybean))
+
+
+@pytest.mark.parametrize('rows', ['one_year', 'unsorted'])
+def test_writeable(soybean, tmp_path, rows):
+
+    # the columns read from the cache belong to the frame returned
+    ts = soybean[soybean['Date'].dt.year == 2020] if rows == 'one_year' else soybean.sample(frac=1, random_state=0)
+    tsf = tsf_vectorizer(cache=str(tmp_path))
+    cold = tsf.fit_transform(ts)
+    warm = tsf.fit_transform(ts)
+
+    assert tsf.cache_stats_['hits'] == n_stages
+    assert_same(warm, cold)
+    warm.loc[warm.index[0], 'lvl_year'] = 1.0
+    warm.iloc[0, 7] = 1.0
+
+
+def test_eviction(tmp_path):
+
+    # the least recently used entries are removed past max_bytes
+    column = {'x': np.arange(1000, dtype=np.float64)}
+    cache = FeatureCache(tmp_path, max_bytes=2 * 8000 + 1000)
+    cache.put('a', column)
+    cache.put('b', column)
+    os.utime(tmp_path / 'a', (1000, 1000))
+    os.utime(tmp_path / 'b', (2000, 2000))
+
+    assert cache.get('a')['x'].tolist() == column['x'].tolist()
+    cache.put('c', column)
+
+    assert sorted(os.listdir(tmp_path)) == ['a', 'c']
+    assert cache.get('b') is None
+    assert cache.info() == {'hits': 1, 'misses': 1, 'evictions': 1, 'entries': 2,
+                            'bytes': cache.info()['bytes']}
+    assert cache.info()['bytes'] <= cache.max_bytes
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import numpy as np
+import pandas as pd
+
+from helpers import assert_same
+from ts_features import _calendar, tsf_vectorizer
+from ts_features._calendar import calendar
+
+
+def cached_bytes():
+
+    return sum(a.nbytes for _, cal in _calendar._cache for a in cal.values())
+
+
+def test_codes(soybean):
+
+    dates = soybean['Date']
+    cal = calendar(dates, 15, 4)
+
+    np.testing.assert_array_equal(cal['year'], dates.dt.year)
+    np.testing.assert_array_equal(cal['month'], dates.dt.month)
+    np.testing.assert_array_equal(cal['slice_month'], np.ceil(dates.dt.day / 15))
+    np.testing.assert_array_equal(cal['slice_year'], np.ceil(dates.dt.month / 4))
+
+
+def test_string_and_tz_dates(soybean):
+
+    ts = soybean.copy()
+    ts['Date'] = ts['Date'].dt.strftime('%Y-%m-%d')
+    assert_same(tsf_vectorizer().fit_transform(ts).drop(columns='Date'),
+                tsf_vectorizer().fit_transform(soybean).drop(columns='Date'))
+
+    ts['Date'] = soybean['Date'].dt.tz_localize('America/Chicago')
+    assert_same(tsf_vectorizer().fit_transform(ts).drop(columns='Date'),
+                tsf_vectorizer().fit_transform(soybean).drop(columns='Date'))
+
+
+def test_cache(soybean, monkeypatch):
+
+    monkeypatch.setattr(_calendar, '_cache', [])
+    cal = calendar(soybean['Date'], 15, 4)
+
+    # same dates in another frame: same result; other slices: computed
+    assert calendar(soybean['Date'].copy(), 15, 4) is cal
+    assert calendar(soybean['Date'], 10, 4) is not cal
+
+    # no copy of the dates is kept
+    assert all(len(entry) == 2 for entry in _calendar._cache)
+
+
+def test_cache_is_bounded(soybean, monkeypatch):
+
+    monkeypatch.setattr(_calendar, '_cache', [])
+    size = sum(a.nbytes for a in calendar(soybean['Date'], 15, 4).values())
+    monkeypatch.setattr(_calendar, '_cache_bytes', 3 * size)
+
+    for days in range(1, 6):
+        calendar(soybean['Date'] + pd.Timedelta(days=days), 15, 4)
+        assert cached_bytes() <= 3 * size
+
+    # a calendar above the budget is not cached
+    monkeypatch.setattr(_calendar, '_cache_bytes', size // 2)
+    monkeypatch.setattr(_calendar, '_cache', [])
+    calendar(soybean['Date'], 15, 4)
+    assert _calendar._cache == []
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import pandas as pd
+import pytest
+
+from helpers import assert_same
+from ts_features import tsf_vectorizer
+
+params = [{}, {'windows': (5, 21), 'lag': 2}, {'feature': 'label', 'steps': 'my'}]
+ids = ['default', 'windows_lag', 'label']
+
+
+@pytest.fixture(params=['csv', 'parquet'])
+def source(request, soybean, tmp_path):
+
+    if request.param == 'parquet':
+        pytest.importorskip('pyarrow')
+        path = str(tmp_path / 'bars.parquet')
+        soybean.to_parquet(path, index=False)
+    else:
+        path = str(tmp_path / 'bars.csv')
+        soybean.to_csv(path, index=False)
+
+    return path
+
+
+def read(path):
+
+    # floats written to CSV are read back exactly with the round trip parser
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+
+    return pd.read_csv(path, parse_dates=['Date'], float_precision='round_trip')
+
+
+@pytest.mark.parametrize('chunksize', [7, 250, 100000])
+@pytest.mark.parametrize('params', params, ids=ids)
+def test_iter_transform(soybean, source, params, chunksize):
+
+    # one block per year, the same rows as fit_transform of the whole series
+    tsf = tsf_vectorizer(**params)
+    blocks = list(tsf.iter_transform(source, chunksize=chunksize))
+
+    assert [b['Date'].dt.year.iloc[0] for b in blocks] == list(range(2015, 2023))
+    assert_same(pd.concat(blocks), tsf_vectorizer(**params).fit_transform(soybean))
+
+
+def test_iter_frames(soybean):
+
+    chunks = (soybean.iloc[i:i + 100] for i in range(0, len(soybean), 100))
+    out = pd.concat(tsf_vectorizer().iter_transform(chunks))
+
+    assert_same(out, tsf_vectorizer().fit_transform(soybean))
+
+
+@pytest.mark.parametrize('dest', ['out.csv', 'out.parquet'])
+@pytest.mark.parametrize('params', params, ids=ids)
+def test_transform_file(soybean, source, tmp_path, params, dest):
+
+    if dest.endswith('.parquet'):
+        pytest.importorskip('pyarrow')
+    dest = str(tmp_path / dest)
+
+    assert tsf_vectorizer(**params).transform_file(source, dest, chunksize=300) == len(soybean)
+    assert_same(read(dest), tsf_vectorizer(**params).fit_transform(soybean))
+
+
+def test_unsorted(soybean):
+
+    chunks = [soybean.iloc[600:], soybean.iloc[:600]]
+    with pytest.raises(ValueError, match="Rows must be sorted by Date"):
+        list(tsf_vectorizer().iter_transform(chunks))
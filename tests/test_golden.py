@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from helpers import assert_same, golden_configs, load_soybean
+from ts_features import tsf_vectorizer
+
+golden = os.path.join(os.path.dirname(__file__), 'data', 'golden.npz')
+configs = golden_configs()
+
+
+def expected(i, name):
+
+    with np.load(golden) as data:
+        columns = json.loads(str(data['meta']))[name]
+        return pd.DataFrame({c: data['%d/%d' % (i, j)] for j, c in enumerate(columns)})
+
+
+def compute(name, params, **kwargs):
+
+    tsf = tsf_vectorizer(**params, **kwargs)
+    if name.startswith('extract_label'):
+        return tsf.extract_label(load_soybean())
+
+    return tsf.fit_transform(load_soybean())
+
+
+def check(out, i, name):
+
+    out = out.copy()
+    out.columns = [str(c) for c in out.columns]
+    assert_same(out, expected(i, name))
+
+
+@pytest.mark.parametrize('i,name,params', [(i, n, p) for i, (n, p) in enumerate(configs)],
+                         ids=[n for n, _ in configs])
+def test_golden(i, name, params):
+
+    check(compute(name, params), i, name)
+
+
+@pytest.mark.parametrize('i,name,params', [(i, n, p) for i, (n, p) in enumerate(configs)
+                                           if n.endswith('-mult') or n.startswith('extract_label')],
+                         ids=[n for n, _ in configs if n.endswith('-mult') or n.startswith('extract_label')])
+def test_golden_numba(i, name, params):
+
+    pytest.importorskip('numba')
+    check(compute(name, params, backend='numba'), i, name)
+
+
+@pytest.mark.parametrize('i,name,params', [(i, n, p) for i, (n, p) in enumerate(configs)
+                                           if n.endswith('-mult')],
+                         ids=[n for n, _ in configs if n.endswith('-mult')])
+def test_golden_cached(i, name, params, tmp_path):
+
+    # a cold run, then a run answered from the cache
+    for _ in range(2):
+        check(compute(name, params, cache=str(tmp_path)), i, name)
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import pytest
+
+from helpers import assert_same
+from ts_features import tsf_vectorizer
+
+
+@pytest.mark.parametrize('n_jobs', [2, None])
+@pytest.mark.parametrize('params', [{}, {'windows': (5, 21), 'lag': 2}, {'base_freq': 'D'}, {'mult': False},
+                                    {'feature': 'label', 'steps': 'my'}],
+                         ids=['default', 'windows_lag', 'base_freq', 'no_mult', 'label'])
+def test_same_as_serial(soybean, params, n_jobs):
+
+    # stages run in threads give the same frame, columns in the same order,
+    # on every run
+    expected = tsf_vectorizer(n_jobs=1, **params).fit_transform(soybean)
+    for _ in range(3):
+        assert_same(tsf_vectorizer(n_jobs=n_jobs, **params).fit_transform(soybean), expected)
+
+
+@pytest.mark.parametrize('n_jobs', [2, None])
+def test_cached(soybean, tmp_path, n_jobs):
+
+    # cold and warm runs, each cache filled by the other number of jobs
+    expected = tsf_vectorizer(n_jobs=1).fit_transform(soybean)
+    for jobs, path in ((n_jobs, tmp_path / 'a'), (1, tmp_path / 'a'), (1, tmp_path / 'b'), (n_jobs, tmp_path / 'b')):
+        for _ in range(2):
+            assert_same(tsf_vectorizer(n_jobs=jobs, cache=str(path)).fit_transform(soybean), expected)
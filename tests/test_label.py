@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import numpy as np
+import pandas as pd
+import pytest
+
+from ts_features import tsf_vectorizer
+
+
+def expected_label(ts, threshold, **params):
+
+    # the feature labels of fit_transform; labels -1 do not vote
+    out = tsf_vectorizer(feature='label', trends=False, seas=False, **params).fit_transform(ts)
+    feats = out.drop(columns=list(ts.columns)).to_numpy()
+    votes = np.abs(np.where(feats == -1, 0, feats).sum(axis=1))
+
+    return np.where(votes > threshold * feats.shape[1], 1, 0)
+
+
+@pytest.mark.parametrize('threshold', [0, 0.25, 0.5, 0.75])
+@pytest.mark.parametrize('params', [{}, {'steps': 'my'}, {'windows': (5,)}], ids=['default', 'my', 'windows'])
+def test_threshold(soybean, params, threshold):
+
+    out = tsf_vectorizer(**params).extract_label(soybean, threshold=threshold)
+
+    assert list(out.columns) == ['Date', 'Close', 'Volume', 'Open', 'High', 'Low', 'label']
+    assert out['label'].tolist() == expected_label(soybean, threshold, **params).tolist()
+
+
+def test_threshold_order(soybean):
+
+    # a higher threshold labels fewer rows
+    counts = [tsf_vectorizer().extract_label(soybean, threshold=t)['label'].sum() for t in (0, 0.25, 0.5, 0.75, 1)]
+
+    assert counts == sorted(counts, reverse=True) and counts[0] > counts[-1] == 0
+
+
+@pytest.mark.parametrize('horizons', [(0, 1, 5), (3,), (1, 21)])
+def test_horizons(soybean, horizons):
+
+    # label_h is the label of the row h bars ahead, 0 past the end
+    label = tsf_vectorizer().extract_label(soybean)['label'].to_numpy()
+    out = tsf_vectorizer().extract_label(soybean, horizons=horizons)
+
+    assert list(out.columns[6:]) == ['label_%d' % h for h in horizons]
+    for h in horizons:
+        shifted = pd.Series(label).shift(-h).fillna(0).astype(label.dtype).to_numpy()
+        assert np.array_equal(out['label_%d' % h].to_numpy(), shifted)
+        assert not out['label_%d' % h].iloc[len(out) - h:].any()
+
+
+def test_horizon_past_the_end(soybean):
+
+    out = tsf_vectorizer().extract_label(soybean.head(3), horizons=(0, 2, 5))
+
+    assert out['label_2'].tolist() == [out['label_0'].iloc[2], 0, 0]
+    assert out['label_5'].tolist() == [0, 0, 0]
+
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import numpy as np
+import pytest
+
+from ts_features import _kernels
+from ts_features._calendar import calendar
+from ts_features._kernels import get_backend, inversions, mk_batch, mk_stats
+
+trends = {'increasing': 1, 'decreasing': -1, 'no trend': 0}
+
+
+def groups(ts, step):
+
+    # Close of every calendar group of the step, one after the other
+    key = calendar(ts['Date'], 15, 4)['key_' + step]
+    order = np.argsort(key, kind='stable')
+    bounds = np.flatnonzero(np.diff(key[order])) + 1
+
+    return ts['Close'].to_numpy()[order], np.concatenate([[0], bounds, [len(key)]])
+
+
+@pytest.mark.parametrize('step', ['w', 'm', 's', 'y'])
+def test_same_as_pymannkendall(soybean, step):
+
+    mk = pytest.importorskip('pymannkendall')
+    x, offsets = groups(soybean, step)
+    result = mk_batch(x, offsets)
+
+    for g, (a, b) in enumerate(zip(offsets[:-1], offsets[1:])):
+        if b - a < 2:
+            # pymannkendall divides by zero; a single value has no trend
+            assert result.trend[g] == 0
+            continue
+        expected = mk.original_test(x[a:b])
+        assert trends[expected.trend] == result.trend[g]
+        assert expected.h == result.h[g] and expected.s == result.s[g]
+        assert result.var_s[g] == pytest.approx(expected.var_s, rel=1e-12)
+        assert result.z[g] == pytest.approx(expected.z, rel=1e-12, abs=1e-15)
+        assert result.p[g] == pytest.approx(expected.p, rel=1e-9, abs=1e-15)
+
+
+def pairwise(x, offsets):
+
+    # S, values and tie correction of every segment, by the definition:
+    # the sign of every pair of values
+    out = []
+    for a, b in zip(offsets[:-1], offsets[1:]):
+        seg = x[a:b][~np.isnan(x[a:b])]
+        s = np.triu(np.sign(seg[None, :] - seg[:, None]), 1).sum()
+        _, tp = np.unique(seg, return_counts=True)
+        out.append((s, len(seg), np.sum(tp * (tp - 1) * (2 * tp + 5))))
+
+    return [np.array(v, dtype=np.float64) for v in zip(*out)]
+
+
+def segments(seed):
+
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(0, 700, rng.integers(1, 10))
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    x = rng.integers(0, rng.integers(1, 80), offsets[-1]).astype(np.float64) * 0.25
+    x[rng.random(len(x)) < 0.1] = np.nan
+
+    return x, offsets
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('sort_size', [0, 50, 200, 10 ** 6])
+def test_pairwise_definition(seed, sort_size, monkeypatch):
+
+    # from every group counted by inversions to every group pair by pair
+    monkeypatch.setattr(_kernels, 'mk_sort_size', sort_size)
+    x, offsets = segments(seed)
+
+    for a, b in zip(mk_stats(x, offsets), pairwise(x, offsets)):
+        np.testing.assert_array_equal(a, b)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_pairwise_definition_numba(seed):
+
+    numba_backend = pytest.importorskip('ts_features._numba')
+    x, offsets = segments(seed)
+
+    for a, b in zip(numba_backend.mk_stats(x, offsets), pairwise(x, offsets)):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_inversions():
+
+    # discordant pairs of several groups at once: ranks of (group, value)
+    # and the group of every rank
+    rng = np.random.default_rng(0)
+    gid = np.sort(rng.integers(0, 4, 900))
+    x = rng.integers(0, 30, 900)
+    pairs = np.unique(np.stack([gid, x], axis=1), axis=0)
+    rank = np.searchsorted(pairs[:, 0] * 30 + pairs[:, 1], gid * 30 + x)
+    expected = [np.triu(v[:, None] > v[None, :], 1).sum() for v in (x[gid == g] for g in range(4))]
+
+    np.testing.assert_array_equal(inversions(rank, pairs[:, 0], 4), expected)
+
+
+def test_large_group():
+
+    # a year of minute bars: one group far above mk_sort_size
+    x = 1000 + np.cumsum(np.random.default_rng(1).integers(-2, 3, 5000)) * 0.25
+    s, n, ties = pairwise(x, [0, len(x)])
+    result = mk_batch(x, [0, len(x)])
+
+    assert result.s[0] == s[0] and result.n[0] == n[0]
+    assert result.var_s[0] == (n[0] * (n[0] - 1) * (2 * n[0] + 5) - ties[0]) / 18
+    numba_backend = pytest.importorskip('ts_features._numba')
+    assert mk_batch(x, [0, len(x)], backend=get_backend('numba')).s[0] == s[0]
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import numpy as np
+import pytest
+from pandas.testing import assert_series_equal
+
+from ts_features import tsf_vectorizer
+
+
+@pytest.mark.parametrize('params', [{}, {'mult': False}, {'feature': 'label'}, {'steps': 'y'},
+                                    {'windows': (3,)}, {'lag': 2}, {'base_freq': 'D'}, {'n_jobs': 2}])
+def test_empty(soybean, params):
+
+    # no rows, the columns of a series with rows
+    columns = list(tsf_vectorizer(**params).fit_transform(soybean.head(30)).columns)
+    out = tsf_vectorizer(**params).fit_transform(soybean.iloc[:0])
+
+    assert len(out) == 0 and list(out.columns) == columns
+
+
+def test_empty_cached(soybean, tmp_path):
+
+    for _ in range(2):
+        out = tsf_vectorizer(cache=str(tmp_path)).fit_transform(soybean.iloc[:0])
+        assert out.shape == (0, 25)
+
+
+def test_empty_label(soybean):
+
+    assert tsf_vectorizer().extract_label(soybean.iloc[:0]).shape == (0, 7)
+
+
+@pytest.mark.parametrize('lag', [3, (1, 5)])
+def test_lags(soybean, lag):
+
+    # the lags are the features shifted by k rows, with zeros at the start,
+    # in writeable columns of their own
+    tsf = tsf_vectorizer(lag=lag, lag_columns=['lvl_year', 'trd_month'])
+    out = tsf.fit_transform(soybean)
+
+    for c in tsf.lag_features_:
+        for k in tsf.lags():
+            assert_series_equal(out['%s_lag%d' % (c, k)], out[c].shift(k).fillna(0).astype(out[c].dtype),
+                                check_names=False, check_exact=True, check_dtype=False)
+
+    out.loc[9, 'lvl_year_lag%d' % tsf.lags()[0]] = 1.0
+    assert out.loc[9, 'trd_month_lag%d' % tsf.lags()[0]] == out.loc[9 - tsf.lags()[0], 'trd_month']
+
+    tensor = tsf.lag_tensor(soybean)
+    for j, k in enumerate(tsf.lags()):
+        assert np.array_equal(tensor[k:, 0, j], out['lvl_year'].to_numpy()[:-k])
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from helpers import assert_same
+from ts_features import tsf_vectorizer
+
+# symbols in an order that is not sorted
+symbols = ['ZS', 'ZC', 'ZW', 'KE']
+
+
+@pytest.fixture(scope='module')
+def series(soybean):
+
+    return {s: soybean.assign(Close=soybean['Close'] + 10 * k) for k, s in enumerate(symbols)}
+
+
+def check(out, series, params):
+
+    # the symbol as first column, the symbols in input order, each one as
+    # fit_transform of its own series
+    assert list(out.columns[:1]) == ['Symbol'] and list(pd.unique(out['Symbol'])) == symbols
+    for s, ts in series.items():
+        part = out[out['Symbol'] == s].drop(columns=['Symbol']).reset_index(drop=True)
+        assert_same(part, tsf_vectorizer(**params).fit_transform(ts))
+
+
+@pytest.mark.parametrize('chunksize', [1, 3])
+@pytest.mark.parametrize('n_jobs', [1, 2])
+@pytest.mark.parametrize('executor', ['process', 'thread'])
+def test_panel(series, executor, n_jobs, chunksize):
+
+    panel = pd.concat([ts.assign(Symbol=s) for s, ts in series.items()], ignore_index=True)
+    out = tsf_vectorizer().fit_transform_panel(panel, n_jobs=n_jobs, executor=executor, chunksize=chunksize)
+
+    check(out, series, {})
+
+
+@pytest.mark.parametrize('executor', ['process', 'thread'])
+def test_dict(series, executor):
+
+    out = tsf_vectorizer(feature='label', windows=(5,)).fit_transform_panel(series, symbol='Symbol', n_jobs=2,
+                                                                            executor=executor)
+
+    check(out, series, {'feature': 'label', 'windows': (5,)})
+
+
+def test_executor(series):
+
+    with ThreadPoolExecutor(2) as pool:
+        out = tsf_vectorizer().fit_transform_panel(series, executor=pool)
+
+    check(out, series, {})
+
+
+@pytest.mark.parametrize('executor', ['process', 'thread'])
+def test_profile_and_logger(series, executor):
+
+    # a callback and a logger are not sent to the workers
+    records = []
+    tsf = tsf_vectorizer(profile=lambda record: records.append(record), logger=logging.getLogger('tsf'))
+    out = tsf.fit_transform_panel(series, n_jobs=2, executor=executor)
+
+    check(out, series, {})
+    assert records == []
+
+
+def test_unknown_column(series):
+
+    with pytest.raises(ValueError):
+        tsf_vectorizer().fit_transform_panel(pd.concat(series.values()), symbol='Ticker')
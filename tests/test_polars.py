@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import numpy as np
+import pytest
+
+from helpers import assert_same, golden_configs
+from ts_features import tsf_vectorizer
+
+pl = pytest.importorskip('polars')
+configs = [(n, p) for n, p in golden_configs() if not n.startswith('extract_label')]
+
+
+def same(expected, out):
+
+    out = out.to_pandas()
+    assert list(out.dtypes) == list(expected.dtypes)
+    assert_same(out, expected)
+
+
+@pytest.mark.parametrize('nan_to_null', [True, False])
+@pytest.mark.parametrize('name,params', configs, ids=[n for n, _ in configs])
+def test_same_as_pandas(soybean, name, params, nan_to_null):
+
+    # the soybean series misses some volumes: NaN in polars sorts above
+    # every number but must be labeled as pandas does
+    tsf = tsf_vectorizer(**params)
+    same(tsf.fit_transform(soybean), tsf.fit_transform(pl.from_pandas(soybean, nan_to_null=nan_to_null)))
+
+
+def test_missing_prices(soybean):
+
+    ts = soybean.copy()
+    ts.loc[5:9, 'Close'] = np.nan
+    ts.loc[30:32, 'Open'] = np.nan
+
+    for feature in ('perc', 'value', 'label'):
+        tsf = tsf_vectorizer(feature=feature)
+        same(tsf.fit_transform(ts), tsf.fit_transform(pl.from_pandas(ts, nan_to_null=False)))
+
+
+def test_arrow(soybean):
+
+    pa = pytest.importorskip('pyarrow')
+    tsf = tsf_vectorizer(dtype='float32')
+    out = tsf.fit_transform(pa.Table.from_pandas(soybean, preserve_index=False))
+
+    assert isinstance(out, pa.Table)
+    same(tsf.fit_transform(soybean), pl.from_arrow(out))
+
+
+@pytest.mark.parametrize('params', [{'windows': (5,)}, {'lag': 2}, {'base_freq': 'D'}])
+def test_pandas_options(soybean, params):
+
+    tsf = tsf_vectorizer(**params)
+    same(tsf.fit_transform(soybean), tsf.fit_transform(pl.from_pandas(soybean)))
+
+
+def test_cache_and_profile(soybean, tmp_path):
+
+    # cache and profile run through the pandas path
+    tsf = tsf_vectorizer(cache=str(tmp_path), profile=True)
+    expected = tsf_vectorizer().fit_transform(soybean)
+    for _ in range(2):
+        same(expected, tsf.fit_transform(pl.from_pandas(soybean)))
+        assert 'end_processing' in [record['stage'] for record in tsf.last_run_stats_]
+
+    assert tsf.cache_stats_['hits'] > 0 and tsf.cache_stats_['entries'] > 0
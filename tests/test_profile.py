@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import logging
+
+import pandas as pd
+import pytest
+
+from ts_features import tsf_vectorizer
+from ts_features._calendar import calendar
+
+
+def n_groups(ts, steps):
+
+    # groups of the default slice_month and slice_year
+    cal = calendar(pd.Series(ts['Date'].to_numpy()), 15, 3)
+
+    return sum(len(pd.unique(cal['key_' + step])) for step in steps)
+
+
+@pytest.mark.parametrize('params,stages', [
+    ({}, ['intraday_values', 'daily_values', 'get_vol', 'get_trends', 'get_seas', 'get_level']),
+    ({'steps': 'y'}, ['intraday_values', 'daily_values', 'get_vol', 'get_trends', 'get_seas', 'get_level']),
+    ({'mult': False, 'windows': (5, 21)}, ['intraday_values', 'get_level', 'get_trends', 'get_seas']),
+    ({'lag': 2, 'trends': False, 'seas': False}, ['intraday_values', 'daily_values', 'get_vol', 'get_level',
+                                                  'get_lags']),
+    ], ids=['default', 'year', 'windows', 'lag'])
+def test_records(soybean, params, stages):
+
+    tsf = tsf_vectorizer(profile=True, **params)
+    tsf.fit_transform(soybean)
+    records = {r['stage']: r for r in tsf.last_run_stats_}
+    steps = params.get('steps', 'wmsy')
+    windows = params.get('windows', ())
+
+    assert list(records) == ['pre_processing'] + stages + ['end_processing']
+    assert all(r['rows'] == len(soybean) and r['seconds'] >= 0 and r['memory'] >= 0 for r in records.values())
+
+    # groups and Mann-Kendall tests: one per calendar group of the steps, and
+    # one per row and window for the trailing trends
+    groups = {'get_vol': n_groups(soybean, steps), 'get_level': n_groups(soybean, steps),
+              'get_trends': n_groups(soybean, steps), 'get_seas': n_groups(soybean, steps.replace('y', ''))}
+    mk_tests = {'get_trends': n_groups(soybean, steps) + len(windows) * len(soybean)}
+    for name, r in records.items():
+        assert r['groups'] == groups.get(name, 0), name
+        assert r['mk_tests'] == mk_tests.get(name, 0), name
+
+
+def test_callback_and_logger(soybean, caplog):
+
+    records = []
+    tsf = tsf_vectorizer(profile=records.append, logger=logging.getLogger('ts_features.test'))
+    with caplog.at_level(logging.INFO, logger='ts_features.test'):
+        tsf.fit_transform(soybean)
+
+    assert records == tsf.last_run_stats_
+    assert [m.split(':')[0] for m in caplog.messages] == [r['stage'] for r in records]
+    assert all('%d groups, %d MK tests' % (r['groups'], r['mk_tests']) in m for r, m in zip(records, caplog.messages))
+
+
+def test_last_run(soybean):
+
+    tsf = tsf_vectorizer()
+    tsf.fit_transform(soybean)
+    with pytest.raises(ValueError):
+        tsf.last_run_stats_
+
+    # every run replaces the records of the previous one
+    tsf = tsf_vectorizer(profile=True)
+    tsf.fit_transform(soybean)
+    tsf.fit_transform(soybean.head(500))
+    assert {r['rows'] for r in tsf.last_run_stats_} == {500}
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import asyncio
+import json
+import os
+import tempfile
+
+import pytest
+
+from helpers import assert_same
+from ts_features import FeatureServer, tsf_vectorizer
+from ts_features._server import _call, _connect, load_test, max_answers, max_rows
+
+
+def call(server, method, target, body=None):
+
+    body = b'' if body is None else json.dumps(body, default=str).encode()
+    status, payload = asyncio.run(server.request(method, target, body))
+
+    return status, json.loads(payload)
+
+
+@pytest.fixture
+def server(soybean):
+
+    return FeatureServer({}, {'ZS': soybean.head(1500)})
+
+
+def test_features(server, soybean):
+
+    status, answer = call(server, 'GET', '/features?symbol=ZS&n=3')
+    expected = tsf_vectorizer().fit_transform(soybean.head(1500)).tail(3)
+
+    assert status == 200 and answer['columns'] == list(expected.columns)
+    for row, values in zip(answer['data'], expected.iloc[:, 1:].values.tolist()):
+        assert row[1:] == pytest.approx(values, rel=1e-9)
+
+
+def test_append(server, soybean):
+
+    bars = soybean.iloc[1500:1502].to_dict('records')
+    assert call(server, 'POST', '/append?symbol=ZS', bars) == (200, {'rows': 1502})
+
+    status, answer = call(server, 'GET', '/features?symbol=ZS&n=1')
+    expected = tsf_vectorizer().fit_transform(soybean.head(1502)).tail(1)
+
+    assert answer['data'][0][1:] == pytest.approx(expected.iloc[0, 1:].tolist(), rel=1e-9)
+
+
+@pytest.mark.parametrize('bars', [
+    [{'Date': '2021-01-11', 'Open': 1500}],
+    [{'Date': 'not a date', 'Open': 1500, 'High': 1501, 'Low': 1499, 'Close': 1500, 'Volume': 10}],
+    [{'Date': '2016-01-11', 'Open': 1500, 'High': 1501, 'Low': 1499, 'Close': 1500, 'Volume': 10}],
+    ], ids=['no_close', 'bad_date', 'older'])
+def test_bad_append(server, bars):
+
+    before = call(server, 'GET', '/features?symbol=ZS&n=5')
+
+    assert call(server, 'POST', '/append?symbol=ZS', bars)[0] == 400
+    assert call(server, 'GET', '/symbols') == (200, {'ZS': 1500})
+    assert call(server, 'GET', '/features?symbol=ZS&n=5') == before
+
+
+@pytest.mark.parametrize('n', ['0', '-3', 'x', str(max_rows + 1)])
+def test_bad_rows(server, n):
+
+    assert call(server, 'GET', '/features?symbol=ZS&n=' + n)[0] == 400
+
+
+def test_answers_are_bounded(server):
+
+    for n in range(1, 3 * max_answers):
+        assert call(server, 'GET', '/features?symbol=ZS&n=%d' % n)[0] == 200
+
+    assert len(server.symbols['ZS'].answers) == max_answers
+
+
+def test_unknown(server):
+
+    assert call(server, 'GET', '/features?symbol=ZC')[0] == 404
+    assert call(server, 'GET', '/nothing')[0] == 404
+    assert call(server, 'POST', '/features?symbol=ZS')[0] == 405
+
+
+def serve(server, client):
+
+    # runs client(path) against the server listening on a Unix socket
+    async def main():
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tsf.sock')
+            listener = await server.start(path)
+            try:
+                return await client(path)
+            finally:
+                listener.close()
+                await listener.wait_closed()
+
+    return asyncio.run(main())
+
+
+def test_socket(server, soybean):
+
+    async def client(path):
+
+        reader, writer = await _connect(path)
+        try:
+            body = json.dumps(soybean.iloc[1500:1502].to_dict('records'), default=str).encode()
+            appended = await _call(reader, writer, 'POST', '/append?symbol=ZS', body)
+            features = await _call(reader, writer, 'GET', '/features?symbol=ZS&n=2')
+            unknown = await _call(reader, writer, 'GET', '/features?symbol=ZC')
+        finally:
+            writer.close()
+
+        return appended, features, unknown
+
+    appended, (status, payload), unknown = serve(server, client)
+    expected = tsf_vectorizer().fit_transform(soybean.head(1502)).tail(2)
+
+    assert appended == (200, b'{"rows": 1502}') and status == 200 and unknown[0] == 404
+    for row, values in zip(json.loads(payload)['data'], expected.iloc[:, 1:].values.tolist()):
+        assert row[1:] == pytest.approx(values, rel=1e-9)
+
+
+@pytest.mark.parametrize('request_line', [b'GARBAGE\r\n\r\n', b'GET /symbols HTTP/1.1\r\nno colon\r\n\r\n',
+                                          b'GET /symbols HTTP/1.1\r\nContent-Length: x\r\n\r\n'],
+                         ids=['request_line', 'header', 'length'])
+def test_malformed(server, request_line):
+
+    async def client(path):
+
+        reader, writer = await _connect(path)
+        writer.write(request_line)
+        await writer.drain()
+        try:
+            return await reader.read()
+        finally:
+            writer.close()
+
+    answer = serve(server, client)
+
+    assert answer.startswith(b'HTTP/1.1 400 Bad Request\r\n')
+    assert server.symbols['ZS'].rows == 1500
+
+
+@pytest.mark.parametrize('order', ['oldest_first', 'newest_first'])
+def test_concurrent_appends(server, soybean, order):
+
+    # one-bar appends from 20 connections at once are fitted in batches; bars
+    # older than those appended before them are answered 400
+    bars = [soybean.iloc[i:i + 1] for i in range(1500, 1520)]
+    bars = bars if order == 'oldest_first' else bars[::-1]
+    state = server.symbols['ZS']
+    fits = []
+    fit = state.fit
+    state.fit = lambda frames: fits.append(len(frames)) or fit(frames)
+
+    async def client(path, bar):
+
+        reader, writer = await _connect(path)
+        try:
+            body = json.dumps(bar.to_dict('records'), default=str).encode()
+            return (await _call(reader, writer, 'POST', '/append?symbol=ZS', body))[0]
+        finally:
+            writer.close()
+
+    async def clients(path):
+
+        return await asyncio.gather(*(client(path, bar) for bar in bars))
+
+    status = serve(server, clients)
+    features = state.tsf.features_
+
+    assert status.count(200) == state.rows - 1500 == sum(fits)
+    assert set(status) <= {200, 400}
+    assert features['Date'].is_monotonic_increasing
+    rows = soybean[soybean['Date'].isin(features['Date'])].reset_index(drop=True)
+    assert_same(features, tsf_vectorizer().fit_transform(rows))
+    if order == 'oldest_first':
+        assert state.rows == 1520 and len(fits) < 20
+
+
+def test_load_test(server, soybean):
+
+    async def client(path):
+
+        return await load_test('ZS', path, clients=4, requests=40, append_every=5, bars=soybean.iloc[1500:1510])
+
+    stats = serve(server, client)
+
+    assert stats['queries'] == 40 and stats['p50_ms'] <= stats['p99_ms']
+    assert server.symbols['ZS'].rows == 1508
+    assert_same(server.symbols['ZS'].tsf.features_, tsf_vectorizer().fit_transform(soybean.head(1508)))
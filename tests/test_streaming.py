@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import numpy as np
+import pandas as pd
+import pytest
+
+from helpers import assert_same
+from ts_features import tsf_vectorizer
+
+
+@pytest.mark.parametrize('bad', [
+    pd.DataFrame({'Date': ['2022-12-29'], 'Open': [1500.0]}),
+    pd.DataFrame({'Date': ['2022-12-29'], 'Open': [1500.0], 'Close': [1500.0], 'High': [1501.0],
+                  'Low': [1499.0]}),
+    pd.DataFrame({'Date': ['not a date'], 'Open': [1500.0], 'Close': [1500.0], 'High': [1501.0],
+                  'Low': [1499.0], 'Volume': [10.0]}),
+    pd.DataFrame({'Date': ['2015-01-02'], 'Open': [1500.0], 'Close': [1500.0], 'High': [1501.0],
+                  'Low': [1499.0], 'Volume': [10.0]}),
+    lambda ts: ts.iloc[1000:1010].iloc[::-1],
+    lambda ts: ts.iloc[995:996],
+    ], ids=['no_close', 'no_volume', 'bad_date', 'older', 'reversed', 'older_bar'])
+def test_rejected_rows(soybean, bad):
+
+    # rows that fail leave the state as it was
+    tsf = tsf_vectorizer().partial_fit(soybean.head(1000))
+    with pytest.raises(ValueError):
+        tsf.partial_fit(bad(soybean) if callable(bad) else bad)
+    tsf.partial_fit(soybean.iloc[1000:])
+
+    assert_same(tsf.features_, tsf_vectorizer().fit_transform(soybean))
+
+
+def test_columns_of_the_configuration(soybean):
+
+    # without mult, only Date, Open and Close are used
+    ts = soybean[['Date', 'Open', 'Close']]
+    tsf = tsf_vectorizer(mult=False).partial_fit(ts.head(500)).partial_fit(ts.iloc[500:])
+
+    assert_same(tsf.features_, tsf_vectorizer(mult=False).fit_transform(ts))
+
+
+def test_empty(soybean):
+
+    tsf = tsf_vectorizer().partial_fit(soybean.iloc[:0])
+
+    assert tsf.features_.shape == (0, 25)
+    assert_same(tsf.partial_fit(soybean).features_, tsf_vectorizer().fit_transform(soybean))
+
+
+@pytest.mark.parametrize('params', [{}, {'feature': 'label', 'steps': 'my'}, {'windows': (5, 21), 'lag': 2},
+                                    {'mult': False}])
+def test_row_by_row(soybean, params):
+
+    # the history at once, then one row at a time over the turn of a year:
+    # a new row has the features fit_transform gives it on the rows so far,
+    # and the final frame is fit_transform of the whole series
+    start = int((soybean['Date'] < '2021-11-15').sum())
+
+    tsf = tsf_vectorizer(**params).partial_fit(soybean.iloc[:start])
+    for i in range(start, len(soybean)):
+        row = tsf.transform_new(soybean.iloc[i:i + 1])
+        if i % 7 == 0:
+            assert_same(row, tsf_vectorizer(**params).fit_transform(soybean.iloc[:i + 1]).tail(1))
+
+    assert_same(tsf.features_, tsf_vectorizer(**params).fit_transform(soybean))
+
+
+@pytest.mark.parametrize('params', [{}, {'windows': (5, 21), 'lag': 2}, {'base_freq': 'D'}])
+def test_chunks(soybean, params):
+
+    # chunks of every size, some inside a year, some across years
+    expected = tsf_vectorizer(**params).fit_transform(soybean)
+    bounds = np.cumsum(np.random.default_rng(0).integers(1, 400, 40))
+    bounds = [0] + [b for b in bounds if b < len(soybean)] + [len(soybean)]
+
+    tsf = tsf_vectorizer(**params)
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        tsf.partial_fit(soybean.iloc[a:b])
+
+    assert_same(tsf.features_, expected)
+
+
+def test_save_load(soybean, tmp_path):
+
+    # the state keeps the open year: features_ starts there
+    path = str(tmp_path / 'state.npz')
+    tsf_vectorizer(windows=(5,)).fit(soybean.iloc[:1500]).save(path)
+    tsf = tsf_vectorizer.load(path)
+    new = tsf.transform(soybean.iloc[1500:])
+    tsf.partial_fit(soybean.iloc[1500:])
+    expected = tsf_vectorizer(windows=(5,)).fit_transform(soybean)
+
+    assert_same(new, expected.iloc[1500:])
+    assert_same(tsf.features_, expected.tail(len(tsf.features_)))
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+from itertools import product
+
+import pytest
+
+from helpers import assert_same
+from ts_features import tsf_vectorizer
+
+
+@pytest.mark.parametrize('params,grid', [
+    ({}, {'feature': ['perc', 'value', 'label'], 'steps': ['wmsy', 'my']}),
+    ({}, {'slice_month': [7, 10, 15], 'slice_year': [3, 6], 'steps': ['wmsy', 'wmy', 'y']}),
+    ({'windows': (5, 21), 'lag': 2}, {'feature': ['perc', 'label'], 'slice_month': [10, 15]}),
+    ({'mult': False, 'dtype': 'float32'}, {'feature': ['value', 'label'], 'slice_year': [4, 6]}),
+    ], ids=['feature_steps', 'slices', 'windows_lag', 'no_mult'])
+def test_same_as_fit_transform(soybean, params, grid):
+
+    # every cell of the grid is fit_transform with its parameters
+    out = tsf_vectorizer(**params).sweep(soybean, grid)
+
+    assert list(out) == list(product(*grid.values()))
+    for values, frame in out.items():
+        assert_same(frame, tsf_vectorizer(**dict(params, **dict(zip(grid, values)))).fit_transform(soybean))
+
+
+def test_frame(soybean):
+
+    grid = {'feature': ['perc', 'label'], 'slice_month': [10, 15]}
+    tsf = tsf_vectorizer(windows=(5,), lag=1)
+    out = tsf.sweep(soybean, grid, frame=True)
+
+    assert out.columns.names == ['feature', 'slice_month', None]
+    for feature, slice_month in product(*grid.values()):
+        expected = tsf_vectorizer(windows=(5,), lag=1, feature=feature, slice_month=slice_month).fit_transform(soybean)
+        cell = out.loc[:, (out.columns.get_level_values(0) == feature)
+                          & (out.columns.get_level_values(1) == slice_month)]
+        assert_same(cell.droplevel([0, 1], axis=1), expected)
+
+
+def test_unknown_parameter(soybean):
+
+    with pytest.raises(ValueError):
+        tsf_vectorizer().sweep(soybean, {'slices': [10]})
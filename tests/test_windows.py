@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import numpy as np
+import pandas as pd
+import pytest
+
+from ts_features import tsf_vectorizer
+from ts_features._kernels import group_mean, mk_batch, rolling_mean, rolling_mk
+
+
+def trailing_windows(x, window):
+
+    # every trailing window, one after the other, and their offsets
+    starts = np.maximum(np.arange(len(x)) - window + 1, 0)
+    parts = [x[a:b + 1] for a, b in zip(starts, range(len(x)))]
+
+    return np.concatenate(parts), np.concatenate([[0], np.cumsum([len(p) for p in parts])])
+
+
+def prices(n=400, seed=0):
+
+    # prices on a tick of 0.25, so that windows have ties, with gaps
+    rng = np.random.default_rng(seed)
+    x = 1000 + np.cumsum(rng.integers(-2, 3, n)) * 0.25
+    x[rng.choice(n, n // 20, replace=False)] = np.nan
+
+    return x
+
+
+@pytest.mark.parametrize('window', [2, 3, 10, 21, 63])
+def test_rolling_mk_is_batch(window):
+
+    x = prices()
+    rolling = rolling_mk(x, window)
+    batch = mk_batch(*trailing_windows(x, window))
+
+    for field in ('trend', 's', 'var_s', 'n', 'z'):
+        np.testing.assert_array_equal(getattr(rolling, field), getattr(batch, field), err_msg=field)
+
+
+@pytest.mark.parametrize('window', [2, 3, 10, 21, 63])
+def test_rolling_mean_is_batch(window):
+
+    x = prices()
+    expected = group_mean(*trailing_windows(x, window))
+
+    np.testing.assert_allclose(rolling_mean(x, window), expected, rtol=1e-13)
+    np.testing.assert_array_equal(rolling_mean(x, window),
+                                  pd.Series(x).rolling(window, min_periods=1).mean().to_numpy())
+
+
+def test_flat_windows():
+
+    # a window of one repeated value has no deviation from its mean
+    v = [1.1, 2.3, 5, 5, 5, 0.7, 0.7, 0.7, 0.3, 0.3, 0.3]
+    ts = pd.DataFrame({'Date': pd.date_range('2020-01-01', periods=len(v)),
+                       'Open': v, 'High': v, 'Low': v, 'Close': v, 'Volume': v})
+    out = tsf_vectorizer(feature='label', windows=(3,)).fit_transform(ts)
+
+    assert list(out['lvl_3']) == [0, 1, 1, 1, 0, -1, -1, 0, -1, -1, 0]
+    assert list(out['vol_3']) == list(out['lvl_3'])
+
+
+@pytest.mark.parametrize('feature', ['perc', 'value', 'label'])
+def test_window_features(soybean, feature):
+
+    out = tsf_vectorizer(feature=feature, windows=(10, 21)).fit_transform(soybean)
+    close, volume = soybean['Close'].to_numpy(), soybean['Volume'].to_numpy()
+    tsf = tsf_vectorizer(feature=feature)
+
+    for window in (10, 21):
+        lvl = tsf.deviation(close, rolling_mean(close, window))
+        vol = tsf.deviation(volume, rolling_mean(volume, window))
+        np.testing.assert_array_equal(out['lvl_%d' % window], np.nan_to_num(lvl).astype(out['lvl_%d' % window].dtype))
+        np.testing.assert_array_equal(out['vol_%d' % window], np.nan_to_num(vol).astype(out['vol_%d' % window].dtype))
+        np.testing.assert_array_equal(out['trd_%d' % window], rolling_mk(close, window).trend)
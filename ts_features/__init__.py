@@ -1,3 +1,13 @@
 from ts_features._model import tsf_vectorizer
 
 __version__ = "1.0"
+
+
+def __getattr__(name):
+
+    # the server (and asyncio) is only imported when used
+    if name == 'FeatureServer':
+        from ts_features._server import FeatureServer
+        return FeatureServer
+
+    raise AttributeError("module 'ts_features' has no attribute %r" % name)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import argparse
+import asyncio
+import json
+
+import pandas as pd
+
+from ts_features._server import FeatureServer, load_test
+
+
+def _history(source, symbol):
+
+    # a CSV or Parquet file of one symbol (named after the file) or of many,
+    # in long format with a symbol column
+    ts = pd.read_parquet(source) if source.lower().endswith(('.parquet', '.pq')) else pd.read_csv(source)
+    ts['Date'] = pd.to_datetime(ts['Date'])
+
+    if symbol in ts.columns:
+        return {key: part.drop(columns=[symbol]) for key, part in ts.groupby(symbol, sort=False)}
+
+    return {source.rsplit('/', 1)[-1].rsplit('.', 1)[0]: ts}
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='python -m ts_features')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    for name in ('serve', 'load-test'):
+        command = commands.add_parser(name)
+        command.add_argument('--unix', help="path of the Unix socket")
+        command.add_argument('--host', default='127.0.0.1')
+        command.add_argument('--port', type=int, default=8765)
+
+    serve = commands.choices['serve']
+    serve.add_argument('--history', action='append', default=[],
+                       help="CSV or Parquet file of past bars, loaded before serving")
+    serve.add_argument('--symbol-column', default='Symbol')
+    serve.add_argument('--params', default='{}', help="tsf_vectorizer parameters, as JSON")
+
+    load = commands.choices['load-test']
+    load.add_argument('--symbol', required=True)
+    load.add_argument('--clients', type=int, default=16)
+    load.add_argument('--requests', type=int, default=10000)
+    load.add_argument('--rows', type=int, default=1, help="rows of features per query")
+    load.add_argument('--append-every', type=int, default=0,
+                      help="append one bar of --bars before every this many queries")
+    load.add_argument('--bars', help="CSV file of the bars to append")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        history = {}
+        for source in args.history:
+            history.update(_history(source, args.symbol_column))
+        server = FeatureServer(json.loads(args.params), history)
+        asyncio.run(server.serve(args.unix, args.host, args.port))
+        return
+
+    bars = pd.read_csv(args.bars) if args.bars else None
+    stats = asyncio.run(load_test(args.symbol, args.unix, args.host, args.port, clients=args.clients,
+                                  requests=args.requests, n=args.rows,
+                                  append_every=args.append_every, bars=bars))
+    print("%(queries)d queries, %(queries_per_second).0f queries/s, "
+          "p50 %(p50_ms).3f ms, p99 %(p99_ms).3f ms" % stats)
+
+
+if __name__ == '__main__':
+    main()
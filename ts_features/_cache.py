@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+# columns read by the stages; the fingerprint of a block only hashes these
+data_columns = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def fingerprint(ts, prefix=b''):
+
+    r"""
+    Hash of the price columns of ``ts``, chained to ``prefix``.
+
+    Chaining the hash of each year to the one of the previous years gives a
+    key that changes whenever any earlier row changes, so a year is only
+    found in the cache when all the history before it is the same.
+
+    """
+
+    columns = [c for c in data_columns if c in ts.columns]
+    rows = pd.util.hash_pandas_object(ts[columns], index=False).to_numpy()
+
+    h = hashlib.blake2b(prefix, digest_size=16)
+    h.update(repr(columns).encode())
+    h.update(rows.tobytes())
+
+    return h.digest()
+
+
+class FeatureCache:
+
+    r"""
+    Feature columns kept on disk, in ``path``, at most ``max_bytes`` in size.
+
+    Every entry is a directory holding one ``.npy`` file per column, read
+    back into arrays of their own (the columns of the frame returned are
+    writeable, and later entries may replace the files). Entries are written to a temporary directory and
+    renamed, so processes and threads can share the cache; the least
+    recently used entries are removed once the cache grows past ``max_bytes``.
+
+    """
+
+    def __init__(self, path, max_bytes=2 ** 30):
+
+        self.path = os.path.expanduser(os.fspath(path))
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.path, exist_ok=True)
+
+    def key(self, *parts):
+
+        return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+    def get(self, key):
+
+        entry = os.path.join(self.path, key)
+        try:
+            with open(os.path.join(entry, 'columns.json')) as f:
+                names = json.load(f)
+            columns = {name: np.load(os.path.join(entry, '%d.npy' % i))
+                       for i, name in enumerate(names)}
+            os.utime(entry)
+        except OSError:
+            # not cached, or evicted by another process while reading
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+
+        return columns
+
+    def put(self, key, columns):
+
+        entry = os.path.join(self.path, key)
+        tmp = tempfile.mkdtemp(prefix='.tmp-', dir=self.path)
+        for i, values in enumerate(columns.values()):
+            np.save(os.path.join(tmp, '%d.npy' % i), values)
+        with open(os.path.join(tmp, 'columns.json'), 'w') as f:
+            json.dump(list(columns), f)
+
+        try:
+            os.replace(tmp, entry)
+        except OSError:
+            # written meanwhile by another process
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        self.evict()
+
+    def entries(self):
+
+        out = []
+        for name in os.listdir(self.path):
+            entry = os.path.join(self.path, name)
+            if name.startswith('.') or not os.path.isdir(entry):
+                continue
+            try:
+                size = sum(f.stat().st_size for f in os.scandir(entry))
+                out.append((os.stat(entry).st_mtime, size, entry))
+            except OSError:
+                continue
+
+        return sorted(out)
+
+    def evict(self):
+
+        with self._lock:
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+
+            for _, size, entry in entries:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+                self.evictions += 1
+
+    def info(self):
+
+        entries = self.entries()
+
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries)}
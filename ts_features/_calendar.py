@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Calendar keys of each step: fortnight (w), month (m), slice of year (s) and year (y)
+step_keys = {'y': ('year',),
+             'm': ('year', 'month'),
+             's': ('year', 'slice_year'),
+             'w': ('year', 'month', 'slice_month')}
+
+step_names = {'y': 'year', 'm': 'month', 's': 'slice_year', 'w': 'slice_month'}
+
+# month, slice_month and slice_year are below 32, so a step key is the
+# calendar values written in base 32 and sorts like the tuple of values
+radix = 32
+
+# calendars of the last calls, keyed by a hash of their dates, at most
+# _cache_bytes of arrays in total
+_cache = []
+_cache_bytes = 64 * 2 ** 20
+
+
+def as_datetime(dates):
+
+    dates = pd.Series(dates)
+    if not isinstance(dates.dtype, pd.DatetimeTZDtype) and not pd.api.types.is_datetime64_dtype(dates):
+        dates = pd.to_datetime(dates)
+
+    if dates.hasnans:
+        raise ValueError(
+            "The column \"Date\" has missing values."
+            )
+
+    return dates
+
+
+def calendar(dates, slice_month, slice_year):
+
+    r"""
+    Calendar codes of a Date column.
+
+    Returns a dict of compact integer arrays: ``year``, ``month``,
+    ``slice_month``, ``slice_year`` and one combined key per step
+    (``key_y``, ``key_m``, ``key_s``, ``key_w``). The last results, up to
+    ``_cache_bytes``, are cached, so calling it again on the same dates
+    skips the work; the dates themselves are not kept, only their hash.
+
+    """
+    dates = as_datetime(dates)
+    values = dates.to_numpy(dtype='datetime64[ns]') if dates.dt.tz is None else dates.dt.tz_localize(None).to_numpy()
+    digest = hashlib.blake2b(np.ascontiguousarray(values).view(np.int64).data, digest_size=16).digest()
+    tag = (str(dates.dtype), slice_month, slice_year, len(values), digest)
+
+    for i, (key, cal) in enumerate(_cache):
+        if key == tag:
+            _cache.append(_cache.pop(i))
+            return cal
+
+    day = dates.dt.day.to_numpy()
+    cal = {'year': dates.dt.year.to_numpy().astype(np.int16),
+           'month': dates.dt.month.to_numpy().astype(np.int8),
+           'slice_month': ((day + slice_month - 1) // slice_month).astype(np.int8)}
+    cal['slice_year'] = ((cal['month'].astype(np.int64) + slice_year - 1) // slice_year).astype(np.int8)
+
+    for step, keys in step_keys.items():
+        key = np.zeros(len(values), dtype=np.int64)
+        for k in keys:
+            key = key * radix + cal[k]
+        cal['key_' + step] = key
+
+    size = sum(a.nbytes for a in cal.values())
+    if size <= _cache_bytes:
+        _cache.append((tag, cal))
+        while sum(a.nbytes for _, c in _cache for a in c.values()) > _cache_bytes:
+            _cache.pop(0)
+
+    return cal
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import numpy as np
+import pandas as pd
+
+from ts_features._calendar import radix, step_keys
+from ts_features._kernels import get_backend
+
+
+class GroupIndex:
+
+    r"""
+    Row groups of every step, built once per transform and shared by the stages.
+
+    For each step, ``codes`` holds the group id of every row (groups sorted
+    by calendar key), ``order`` the row order that makes each group
+    contiguous (``None`` when the rows already are) and ``offsets`` the
+    boundaries of the groups in that order. ``years`` numbers the years in
+    order of appearance.
+
+    """
+
+    def __init__(self, cal, steps, backend=None):
+
+        self.cal = cal
+        self.backend = backend or get_backend('numpy')
+        self.n_rows = len(cal['year'])
+        self.years = pd.factorize(cal['year'])[0]
+
+        self.codes = {}
+        self.keys = {}
+        self.order = {}
+        self.offsets = {}
+
+        for step in steps:
+            codes, keys = pd.factorize(cal['key_' + step], sort=True)
+            offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(codes, minlength=len(keys)), out=offsets[1:])
+
+            self.codes[step] = codes
+            self.keys[step] = keys
+            self.order[step] = None if np.all(codes[1:] >= codes[:-1]) else np.argsort(codes, kind='stable')
+            self.offsets[step] = offsets
+
+    def n_groups(self, step):
+
+        return len(self.keys[step])
+
+    def sizes(self, step):
+
+        return np.diff(self.offsets[step])
+
+    def take(self, step, values):
+
+        # values reordered so that every group is contiguous
+        order = self.order[step]
+
+        return values if order is None else values[order]
+
+    def first(self, step, values):
+
+        start = self.offsets[step][:-1]
+        order = self.order[step]
+
+        return values[start if order is None else order[start]]
+
+    def periods(self, step):
+
+        # position of each group inside its year (month, fortnight, slice)
+        return self.keys[step] % radix ** (len(step_keys[step]) - 1)
+
+    def mean(self, step, values):
+
+        return self.backend.group_mean(self.take(step, values), self.offsets[step])
+
+    def broadcast(self, step, values):
+
+        return values[self.codes[step]]
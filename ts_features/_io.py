@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import numpy as np
+import pandas as pd
+
+from ts_features._calendar import as_datetime
+
+
+def _is_parquet(path):
+
+    return str(path).lower().endswith(('.parquet', '.pq'))
+
+
+def read_chunks(source, chunksize=100000):
+
+    r"""
+    Read a CSV or Parquet file in chunks of about ``chunksize`` rows.
+
+    ``source`` may also be an iterable of DataFrames, which is passed
+    through. Chunks get a running index.
+
+    """
+
+    if not isinstance(source, str):
+        chunks = iter(source)
+    elif _is_parquet(source):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError(
+                "Reading Parquet files requires pyarrow."
+                )
+        chunks = (batch.to_pandas() for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize))
+    else:
+        chunks = pd.read_csv(source, chunksize=chunksize)
+
+    n_rows = 0
+    for chunk in chunks:
+        chunk = chunk.set_axis(pd.RangeIndex(n_rows, n_rows + len(chunk)))
+        n_rows += len(chunk)
+        yield chunk
+
+
+def year_blocks(chunks):
+
+    r"""
+    Regroup chunks of a series sorted by Date into one block per year.
+
+    A year is only released once a row of a later year is read, so memory
+    holds at most one year plus one chunk.
+
+    """
+
+    pending = None
+    for chunk in chunks:
+        if len(chunk) == 0:
+            continue
+
+        chunk = chunk.assign(Date=as_datetime(chunk['Date']))
+        buf = chunk if pending is None else pd.concat([pending, chunk])
+
+        years = buf['Date'].dt.year.to_numpy()
+        if np.any(np.diff(years) < 0):
+            raise ValueError(
+                "Rows must be sorted by Date."
+                )
+
+        bounds = np.r_[0, np.flatnonzero(np.diff(years)) + 1, len(buf)]
+        for a, b in zip(bounds[:-2], bounds[1:-1]):
+            yield buf.iloc[a:b]
+        pending = buf.iloc[bounds[-2]:]
+
+    if pending is not None:
+        yield pending
+
+
+def write_frames(frames, dest):
+
+    r"""
+    Write frames one after the other to a Parquet or CSV file.
+
+    Returns the number of rows written.
+
+    """
+
+    if _is_parquet(dest):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError(
+                "Writing Parquet files requires pyarrow."
+                )
+
+    n_rows = 0
+    writer = None
+    try:
+        for i, frame in enumerate(frames):
+            if _is_parquet(dest):
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(dest, table.schema)
+                writer.write_table(table.cast(writer.schema))
+            else:
+                frame.to_csv(dest, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+            n_rows += len(frame)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return n_rows
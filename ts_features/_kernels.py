@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import math
+import sys
+import warnings
+from collections import namedtuple
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# NumPy kernels. Segmented kernels take values grouped contiguously, with
+# group g in values[offsets[g]:offsets[g + 1]]; ts_features._numba has the
+# same functions compiled with Numba.
+
+numpy_backend = sys.modules[__name__]
+
+# groups larger than this get S by counting inversions, in O(n log² n)
+# with NumPy and O(n log n) with Numba, rather than by comparing every pair
+mk_sort_size = 200
+
+# values given to mk_stats at once, in whole groups: its temporaries take
+# about 150 bytes per value
+mk_chunk_size = 2 ** 14
+
+
+class mk_result(namedtuple('Mann_Kendall_Batch', ['trend', 'h', 'z', 's', 'var_s', 'n'])):
+
+    # the p-values are only computed when read: the trends only need z
+    __slots__ = ()
+
+    @property
+    def p(self):
+
+        return np.array([math.erfc(v / math.sqrt(2)) for v in np.abs(self.z)])
+
+
+def get_backend(name):
+
+    if name == 'numba':
+        try:
+            from ts_features import _numba
+            return _numba
+        except ImportError:
+            warnings.warn("Numba is not installed, the NumPy backend is used instead.")
+
+    return numpy_backend
+
+
+def group_mean(values, offsets):
+
+    n_groups = len(offsets) - 1
+    codes = np.repeat(np.arange(n_groups), np.diff(offsets))
+    means = pd.Series(values).groupby(codes).mean()
+
+    # empty segments have no mean, as in the numba kernel
+    return means.reindex(range(n_groups)).to_numpy() if len(means) < n_groups else means.to_numpy()
+
+
+def mk_stats(x, offsets):
+
+    n_groups = len(offsets) - 1
+    gid = np.repeat(np.arange(n_groups), np.diff(offsets))
+
+    valid = ~np.isnan(x)
+    x, gid = x[valid], gid[valid]
+    n = np.bincount(gid, minlength=n_groups).astype(np.float64)
+
+    # tie correction from the length of each run of equal values
+    order = np.lexsort((x, gid))
+    xs, gs = x[order], gid[order]
+    start = np.ones(len(xs), dtype=bool)
+    start[1:] = (xs[1:] != xs[:-1]) | (gs[1:] != gs[:-1])
+    idx = np.flatnonzero(start)
+    tp = np.diff(np.append(idx, len(xs))).astype(np.float64)
+    ties = np.bincount(gs[idx], weights=tp * (tp - 1) * (2 * tp + 5), minlength=n_groups)
+
+    s = np.zeros(n_groups)
+    large = n > mk_sort_size
+
+    if large.any():
+        # S = concordant - discordant pairs = all pairs - tied pairs - 2 * discordant
+        rank = np.empty(len(x), dtype=np.int64)
+        rank[order] = np.cumsum(start) - 1
+        tied = np.bincount(gs[idx], weights=tp * (tp - 1) / 2, minlength=n_groups)
+        discordant = inversions(rank[large[gid]], gs[idx], n_groups)
+        s[large] = (n * (n - 1) / 2 - tied - 2 * discordant)[large]
+        x, gid = x[~large[gid]], gid[~large[gid]]
+
+    # S = sum over pairs i < j of sign(x_j - x_i), pairs taken lag by lag
+    for k in range(1, int(n[~large].max()) if (~large).any() else 0):
+        same = gid[k:] == gid[:-k]
+        sign = (x[k:] > x[:-k]).astype(np.int8) - (x[k:] < x[:-k])
+        s += np.bincount(gid[k:][same], weights=sign[same], minlength=n_groups)
+
+    return s, n, ties
+
+
+def inversions(rank, group_of, n_groups):
+
+    r"""
+    Number of pairs i < j with ``rank[i] > rank[j]`` in every group.
+
+    ``rank`` is the dense rank of (group, value), so pairs of different
+    groups are never inverted, and ``group_of[r]`` is the group of rank
+    ``r``. Pairs are counted by a bottom-up merge sort: at each level, every
+    value of a right block counts the greater values of the left block next
+    to it, found by binary search, which is O(n log² n) over all groups.
+
+    """
+    m = len(rank)
+    pos = np.arange(m)
+    span = int(rank.max()) + 1 if m else 0
+    out = np.zeros(n_groups)
+
+    # ranks sorted within each block of width values
+    block = rank
+    width = 1
+    while width < m:
+        pair = pos // (2 * width)
+        right = (pos // width) % 2 == 1
+        key = pair * span + block
+
+        # the left block of pair p ends at (p + 1) * width among the left values
+        found = np.searchsorted(key[~right], key[right], side='right')
+        greater = (pair[right] + 1) * width - found
+        out += np.bincount(group_of[block[right]], weights=greater, minlength=n_groups)
+
+        # merge the two blocks of every pair: they are two sorted runs
+        block = np.sort(key, kind='stable') - pair * span
+        width *= 2
+
+    return out
+
+
+def same_counts(trend):
+
+    same = np.zeros(trend.shape, dtype=np.int64)
+
+    # running count of previous years in each trend class
+    for c in (-1, 0, 1):
+        hit = trend == c
+        same[hit] = (np.cumsum(hit, axis=0) - hit)[hit]
+
+    return same
+
+
+def mk_batch(x, offsets, alpha=0.05, backend=None):
+    r"""
+    Mann-Kendall test of every segment ``x[offsets[g]:offsets[g + 1]]``.
+
+    Equivalent to calling ``pymannkendall.original_test`` once per segment
+    (missing values skipped, tie-corrected variance, two-tailed test), but
+    computed for all segments at once: the S statistic is accumulated lag
+    by lag over the whole array, so there is no Python work per group.
+    Segments of more than ``mk_sort_size`` values get S from the number of
+    inverted pairs instead, counted in O(n log² n) (O(n log n) with the
+    Numba backend).
+
+    Returns arrays with one entry per segment; ``trend`` is 1 (increasing),
+    -1 (decreasing) or 0 (no trend). Segments with fewer than two values
+    have no trend.
+
+    """
+    x = np.asarray(x, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    kernels = backend or numpy_backend
+    
+    # groups are taken in chunks of about mk_chunk_size values, so the
+    # temporaries do not grow with the series
+    first = np.flatnonzero(np.diff(offsets[:-1] // mk_chunk_size, prepend=-1)) if len(offsets) > 1 else np.zeros(1, dtype=np.int64)
+    stats = []
+    for a, b in zip(first, np.append(first[1:], len(offsets) - 1)):
+        bounds = offsets[a:b + 1]
+        stats.append(kernels.mk_stats(x[bounds[0]:bounds[-1]], bounds - bounds[0]))
+    s, n, ties = (np.concatenate(v) for v in zip(*stats)) if len(stats) != 1 else stats[0]
+    
+    return mk_test(s, n, ties, alpha)
+
+
+def mk_test(s, n, ties, alpha=0.05):
+    
+    # two-tailed test of S statistics with n values and tie correction ties
+    var_s = (n * (n - 1) * (2 * n + 5) - ties) / 18
+
+    z = np.zeros(len(s))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(s > 0, (s - 1) / np.sqrt(var_s), z)
+        z = np.where(s < 0, (s + 1) / np.sqrt(var_s), z)
+
+    h = np.abs(z) > NormalDist().inv_cdf(1 - alpha / 2)
+    trend = np.zeros(len(s), dtype=np.int8)
+    trend[h & (z > 0)] = 1
+    trend[h & (z < 0)] = -1
+
+    return mk_result(trend, h, z, s, var_s, n.astype(np.int64))
+
+
+def rolling_mean(values, window):
+    
+    r"""
+    Mean of the last ``window`` values at every position, missing values
+    skipped; the first positions average the values available so far.
+    
+    Same as ``pandas.Series.rolling(window, min_periods=1).mean()``: its
+    running sums are compensated, and a window of one repeated value has
+    that value as mean, so the labels of a flat window are 0.
+    
+    """
+    values = pd.Series(np.asarray(values, dtype=np.float64))
+    
+    return values.rolling(window, min_periods=1).mean().to_numpy()
+
+
+def rolling_mk(x, window, alpha=0.05):
+    
+    r"""
+    Mann-Kendall test of the last ``window`` values at every position.
+    
+    Same result as ``mk_batch`` on each trailing window, but S and the tie
+    correction are updated as the window slides: a value entering the
+    window adds its sign against the values inside, a value leaving removes
+    its own, so the cost is O(window) per position instead of O(window²).
+    
+    """
+    x = np.asarray(x, dtype=np.float64)
+    m = len(x)
+    valid = ~np.isnan(x)
+    
+    count = np.cumsum(valid)
+    count[window:] = count[window:] - count[:-window]
+    
+    s = np.zeros(m, dtype=np.int64)
+    added = np.zeros(m, dtype=np.int64)
+    removed = np.ones(m, dtype=np.int64)
+    
+    for k in range(1, min(window, m)):
+        # signs and equalities of every pair k positions apart
+        sign = np.zeros(m, dtype=np.int64)
+        sign[k:] = (x[k:] > x[:-k]).astype(np.int64) - (x[k:] < x[:-k])
+        equal = np.zeros(m, dtype=np.int64)
+        equal[k:] = x[k:] == x[:-k]
+        
+        # pairs of the window ending at i: second value in (i - window + k, i]
+        total = np.cumsum(sign)
+        s += total
+        if window - k < m:
+            s[window - k:] -= total[:m - window + k]
+        
+        # copies of the entering value, and of the leaving value, in the window
+        added += equal
+        if window < m:
+            removed[window:] += equal[k:m - window + k]
+    
+    # tie correction t(t - 1)(2t + 5) of each value, updated on entry and exit
+    f = lambda t: t * (t - 1) * (2 * t + 5)
+    delta = np.where(valid, f(added + 1) - f(added), 0)
+    leaving = np.zeros(m, dtype=np.int64)
+    leaving[window:] = np.where(valid[:-window], f(removed[window:]) - f(removed[window:] - 1), 0)
+    ties = np.cumsum(delta - leaving)
+    
+    return mk_test(s.astype(np.float64), count.astype(np.float64), ties.astype(np.float64), alpha)
+
+
+def seasonality(trend, backend=None):
+    r"""
+    Seasonality of a (year x period) trend matrix.
+
+    Each cell receives the percentage of the previous years (rows above it)
+    whose trend in the same period (column) equals its own, rounded to two
+    decimals. The first year has no history and gets 0.
+
+    """
+    trend = np.asarray(trend, dtype=np.float64)
+    same = (backend or numpy_backend).same_counts(trend)
+
+    years = np.arange(trend.shape[0]).reshape(-1, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sea = np.where(years > 0, (100 * same) / years, 0.0)
+
+    return np.round(sea, 2)
@@ -1,12 +1,41 @@
 # -*- coding: utf-8 -*-
 # Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import json
+import os
+from contextlib import contextmanager, nullcontext
+from itertools import product
+
 import pandas as pd
-import pymannkendall as mk
-import math
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ts_features._cache import FeatureCache, fingerprint
+from ts_features._calendar import as_datetime, calendar, radix, step_keys, step_names
+from ts_features._groups import GroupIndex
+from ts_features._kernels import get_backend, mk_batch, rolling_mean, rolling_mk, seasonality
+from ts_features._polars import is_frame, transform_polars
+from ts_features._profile import RunStats
 
 #__all__ = ['tsf_vectorizer']
 
+# parameter that switches each stage on
+stage_flags = {'intraday_values': 'osc',
+               'daily_values': 'diff_vl',
+               'get_vol': 'vol',
+               'get_trends': 'trends',
+               'get_seas': 'seas',
+               'get_level': 'levels',
+               'get_lags': 'lag'}
+
+# stages whose columns a stage reads; the others only read the input series
+# and run concurrently with n_jobs > 1
+stage_inputs = {'get_seas': ('get_trends',),
+                'get_lags': ('intraday_values', 'daily_values', 'get_vol',
+                             'get_trends', 'get_seas', 'get_level')}
+
+# stages over calendar groups, run on the bars of base_freq when it is set
+calendar_stages = ('get_vol', 'get_trends', 'get_seas', 'get_level')
+
 class tsf_vectorizer:
     
     r""" 
@@ -31,7 +60,17 @@ class tsf_vectorizer:
                  feature = 'perc', # label, perc, value
                  steps  = 'wmsy',
                  slice_month = int(15),
-                 slice_year = int(3)
+                 slice_year = int(3),
+                 dtype = 'float64',
+                 backend = 'numpy',
+                 cache = None,
+                 cache_size = 2 ** 30,
+                 profile = False,
+                 logger = None,
+                 windows = (),
+                 lag_columns = None,
+                 n_jobs = 1,
+                 base_freq = None
                  )->None:
     
         self.mult = mult
@@ -47,476 +86,442 @@ class tsf_vectorizer:
         self.steps = steps
         self.slice_month = slice_month
         self.slice_year = slice_year
+        self.dtype = dtype
+        self.backend = backend
+        self.cache = cache
+        self.cache_size = cache_size
+        self.profile = profile
+        self.logger = logger
+        self.windows = windows
+        self.lag_columns = lag_columns
+        self.n_jobs = n_jobs
+        self.base_freq = base_freq
         self.bin = tuple()
         
+        # context of the block being transformed (see partial_fit)
+        self._prev_close = None
+        self._prev_rows = None
+        self._trend_history = {}
+        self._fingerprint = None
+        self._cache_store = None
+        self._memo = None
+        self._run = None
+        self._last_run = None
+        
+        # streaming state: closed years and raw rows of the open year
+        self._closed = []
+        self._n_closed = 0
+        self._open = None
+        self._open_out = None
+        self._open_year = None
+        self._tail = None
+        self._last_date = None
+        self._history = {}
+        
     def pre_processing(self, ts):
         
-        ts['year'] = [d.year for d in ts.Date]
-        ts['month'] = [int(m.strftime('%m')) for m in ts.Date]
+        return calendar(ts['Date'], self.slice_month, self.slice_year)
+    
+    def resample(self, ts):
         
-        ts['slice_month'] = [d.day / self.slice_month for d in ts.Date]
-        ts['slice_month'] = ts['slice_month'].apply(lambda x: math.ceil(x))
+        # bars of base_freq (first Open, highest High, lowest Low, last Close,
+        # total Volume) and the bar of every row; the Volume of a bar whose
+        # volumes are all missing is missing, not 0
+        dates = as_datetime(ts['Date']).dt.floor(self.base_freq)
+        bars, keys = pd.factorize(dates)
         
-        ts['slice_year'] = [int(b.strftime('%m')) / self.slice_year for b in ts.Date]
-        ts['slice_year'] = ts['slice_year'].apply(lambda x: math.ceil(x))
+        agg = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'}
+        agg = {c: f for c, f in agg.items() if c in ts.columns}
+        frame = ts[list(agg)].groupby(bars).agg(agg).reset_index(drop=True)
+        if 'Volume' in ts.columns:
+            frame['Volume'] = ts['Volume'].groupby(bars).sum(min_count=1).to_numpy()
+        frame.insert(0, 'Date', keys)
         
-        #ts.set_index('Date', inplace=True)
-
-        return ts
+        return frame, bars
+    
+    def store(self, feats, name, values, sign=False):
+        
+        # missing values are written as 0; columns holding only -1/0/1 are int8
+        column = np.empty(len(values), dtype=np.int8 if sign else self.dtype)
+        with np.errstate(invalid='ignore'):
+            column[:] = values
+        column[np.isnan(values)] = 0
+        feats[name] = column
+        
+        return feats
     
-    def get_level(self, ts):
-              
-        if 'y' in self.steps and self.levels:
+    def deviation(self, values, level):
         
-            y_lvl = ts[['Close', 'year']].groupby(['year']).mean().reset_index()
-            y_lvl.rename(columns={"Close": "level"}, inplace=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
             
-            ts['lvl_year'] = 0.0
+            if self.feature == 'label':
+                return np.select([values > level, values < level], [1.0, -1.0], 0.0)
             
-            for c, y in y_lvl[['level','year']].values:
-                
-                
-                if self.feature == 'label':
-                    ts.loc[(ts['year'] == y) & 
-                           (ts['Close'] > c), 'lvl_year'] = 1
-                    ts.loc[(ts['year'] == y) &
-                           (ts['Close'] < c), 'lvl_year'] = -1
-
-                if self.feature == 'value':
-                    ts.loc[(ts['year'] == y), 'lvl_year'] = ts['Close'].apply(lambda x: x - c).round(2)
-
-                if self.feature == 'perc':
-                    
-                    ts.loc[(ts['year'] == y), 'lvl_year'] = ts['Close'].apply(lambda x: ((x - c) / c)*100).round(2)
-                    
-        if 'm' in self.steps and self.levels: 
-            m_lvl = ts[['Close', 'year', 'month']].groupby(['year', 'month']).mean().reset_index()
-            m_lvl.rename(columns={"Close": "level"}, inplace=True)
-              
-            ts['lvl_month'] = 0.0
-                        
-            for c, y, m in m_lvl[['level','year', 'month']].values:
-                
-                if self.feature == 'label':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['month'] == m) &
-                           (ts['Close'] > c), 'lvl_month'] = 1
-                    
-                    ts.loc[(ts['year'] == y) &
-                           (ts['month'] == m) &
-                           (ts['Close'] < c), 'lvl_month'] = -1
-                
-                if self.feature == 'value':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['month'] == m), 'lvl_month'] = ts['Close'].apply(lambda x: x - c).round(2)
-                
-                if self.feature == 'perc':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['month'] == m), 'lvl_month'] = ts['Close'].apply(lambda x: ((x - c) / c)*100).round(2)
+            if self.feature == 'value':
+                return np.round(values - level, 2)
+            
+            if self.feature == 'perc':
+                return np.round(((values - level) / level) * 100, 2)
+    
+    def group_level(self, index, values, step):
         
-        if 's' in self.steps and self.levels:
+        self._count('groups', index.n_groups(step))
         
-            s_lvl = ts[['Close', 'year', 'slice_year']].groupby(['year', 'slice_year']).mean().reset_index()
-            s_lvl.rename(columns={"Close": "level"}, inplace=True)
-            
-            ts['lvl_slice_year'] = 0.0
+        return index.broadcast(step, index.mean(step, values))
+    
+    def trailing(self, ts, column):
         
-            for c, y, s in s_lvl[['level','year', 'slice_year']].values:
-                
-                if self.feature == 'label':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['slice_year'] == s) &
-                           (ts['Close'] > c), 'lvl_slice_year'] = 1
-                    ts.loc[(ts['year'] == y) &
-                           (ts['slice_year'] == s) &
-                           (ts['Close'] < c), 'lvl_slice_year'] = -1
-                    
-                if self.feature == 'value':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['slice_year'] == s), 'lvl_slice_year'] = ts['Close'].apply(lambda x: x - c).round(2)
-                    
-                if self.feature == 'perc':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['slice_year'] == s), 'lvl_slice_year'] = ts['Close'].apply(lambda x: ((x - c) / c)*100).round(2)
+        # values of the rows before this block (see partial_fit), then of the block
+        values = ts[column].to_numpy(dtype=np.float64)
+        if self._prev_rows is None:
+            return values, 0
+        
+        prev = self._prev_rows if self.base_freq is None else self.resample(self._prev_rows)[0]
+        prev = prev[column].to_numpy(dtype=np.float64)
+        
+        return np.concatenate([prev, values]), len(prev)
+    
+    def window_level(self, ts, column, window):
         
-        if 'w' in self.steps and self.levels:
+        values, skip = self.trailing(ts, column)
         
-            w_lvl = ts[['Close', 'year', 'month', 'slice_month']].groupby(['year', 'month', 'slice_month']).mean().reset_index()
-            w_lvl.rename(columns={"Close": "level"}, inplace=True)
+        return rolling_mean(values, window)[skip:]
+    
+    def window_trends(self, ts, window):
+        
+        close, skip = self.trailing(ts, 'Close')
+        self._count('mk_tests', len(ts))
+        
+        return rolling_mk(close, window).trend[skip:]
+    
+    def get_level(self, ts, index, feats):
+        
+        if self.levels:
+            close = ts['Close'].to_numpy(dtype=np.float64)
             
-            ts['lvl_slice_month'] = 0.0
+            for step in 'ymsw':
+                if step in self.steps:
+                    level = self._shared(('lvl',) + self._group_tag(step),
+                                         lambda: self.group_level(index, close, step))
+                    self.store(feats, 'lvl_' + step_names[step], self.deviation(close, level),
+                               sign=self.feature == 'label')
             
-            for c, y, m, w in w_lvl[['level','year', 'month', 'slice_month']].values:
-                
-                if self.feature == 'label':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['month'] == m) &
-                           (ts['slice_month'] == w) &
-                           (ts['Close'] > c), 'lvl_slice_month'] = 1
+            for window in self.windows:
+                level = self._shared(('lvl', window, self.base_freq), lambda: self.window_level(ts, 'Close', window))
+                self.store(feats, 'lvl_%d' % window, self.deviation(close, level),
+                           sign=self.feature == 'label')
                     
-                    ts.loc[(ts['year'] == y) &
-                           (ts['month'] == m) &
-                           (ts['slice_month'] == w) &
-                           (ts['Close'] < c), 'lvl_slice_month'] = -1
-                    
-                if self.feature == 'value':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['month'] == m) &
-                           (ts['slice_month'] == w), 'lvl_slice_month'] = ts['Close'].apply(lambda x: x - c).round(2)
-                
-                if self.feature == 'perc':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['month'] == m) &
-                           (ts['slice_month'] == w), 'lvl_slice_month'] = ts['Close'].apply(lambda x: ((x - c) / c)*100).round(2)
-                    
-        return ts
+        return feats
     
-    def get_trends(self, ts):
+    def get_trends(self, ts, index, feats):
         
-        if 'y' in self.steps and self.trends: 
-
-            ts['trd_year'] = 0.0
-            
-            for y in ts['year'].unique():
-                dt = ts[(ts['year'] == y)]
-                result = mk.original_test(dt['Close'])
-              
-                if result.trend == 'decreasing':
-                    ts.loc[(ts['year'] == y), 'trd_year'] = -1.0
-                elif result.trend == 'increasing':
-                    ts.loc[(ts['year'] == y), 'trd_year'] = 1.0
-
-        if 'm' in self.steps and self.trends:
-            ts['trd_month'] = 0.0
+        if self.trends:
+            close = ts['Close'].to_numpy(dtype=np.float64)
             
-            for y in ts['year'].unique():
-                for m in ts['month'].unique():
-                    dt = ts[(ts['year'] == y) & (ts['month'] == m)]
-                    result = mk.original_test(dt['Close'])
-              
-                    if result.trend == 'decreasing':
-                        ts.loc[(ts['year'] == y) & 
-                               (ts['month'] == m), 'trd_month'] = -1.0
-                    elif result.trend == 'increasing':
-                        ts.loc[(ts['year'] == y) & 
-                               (ts['month'] == m), 'trd_month'] = 1.0
-                        
-        if 'w' in self.steps and self.trends:
-            ts['trd_slice_month'] = 0.0
+            for step in 'ymws':
+                if step in self.steps:
+                    trend = self._shared(('trd',) + self._group_tag(step),
+                                         lambda: self.group_trends(index, close, step))
+                    self.store(feats, 'trd_' + step_names[step], index.broadcast(step, trend), sign=True)
             
-            for y in ts['year'].unique():
-                for m in ts['month'].unique():
-                    for w in ts['slice_month'].unique():
-                        dt = ts[(ts['year'] == y) &
-                                (ts['month'] == m) & 
-                                (ts['slice_month'] == w)]
-                        
-                        if dt.shape[0] > 3:
-                            result = mk.original_test(dt['Close'])
-                      
-                            if result.trend == 'decreasing':
-                                ts.loc[(ts['year'] == y) & 
-                                       (ts['month'] == m) & 
-                                       (ts['slice_month'] == w), 'trd_slice_month'] = -1.0
-                            elif result.trend == 'increasing':
-                                ts.loc[(ts['year'] == y) & 
-                                       (ts['month'] == m) & 
-                                       (ts['slice_month'] == w), 'trd_slice_month'] = 1.0
+            for window in self.windows:
+                trend = self._shared(('trd', window, self.base_freq), lambda: self.window_trends(ts, window))
+                self.store(feats, 'trd_%d' % window, trend, sign=True)
 
-        if 's' in self.steps and self.trends:
-            ts['trd_slice_year'] = 0.0
+        return feats
+    
+    def group_trends(self, index, close, step):
+        
+        self._count('groups', index.n_groups(step))
+        self._count('mk_tests', index.n_groups(step))
+        trend = mk_batch(index.take(step, close), index.offsets[step], backend=index.backend).trend
+        
+        if step == 'w':
+            # a fortnight is only tested with more than three prices
+            trend[index.sizes(step) <= 3] = 0
+        
+        return trend
+    
+    def get_vol(self, ts, index, feats):
+        
+        if self.vol:
+            volume = ts['Volume'].to_numpy(dtype=np.float64)
             
-            for y in ts['year'].unique():
-                for sy in ts['slice_year'].unique():
-                    dt = ts[(ts['year'] == y) & (ts['slice_year'] == sy)]
-                    result = mk.original_test(dt['Close'])
-                    
-                    if result.trend == 'decreasing':
-                        ts.loc[(ts['year'] == y) & 
-                               (ts['slice_year'] == sy), 'trd_slice_year'] = -1.0
-                    elif result.trend == 'increasing':
-                        ts.loc[(ts['year'] == y) & 
-                               (ts['slice_year'] == sy), 'trd_slice_year'] = 1.0
-
-        return ts
+            for step in 'ymsw':
+                if step in self.steps:
+                    level = self._shared(('vol',) + self._group_tag(step),
+                                         lambda: self.group_level(index, volume, step))
+                    self.store(feats, 'vol_' + step_names[step], self.deviation(volume, level),
+                               sign=self.feature == 'label')
+            
+            for window in self.windows:
+                level = self._shared(('vol', window, self.base_freq), lambda: self.window_level(ts, 'Volume', window))
+                self.store(feats, 'vol_%d' % window, self.deviation(volume, level),
+                           sign=self.feature == 'label')
+        
+        return feats
     
-    def get_vol(self, ts):
+    def trend_matrix(self, index, trend, step):
         
-        if 'y' in self.steps and self.vol:
+        years = index.first(step, index.years)
+        periods = index.periods(step)
+        n_periods = radix ** (len(step_keys[step]) - 1)
         
-            y_vol = ts[['Volume', 'year']].groupby(['year']).mean().reset_index()
-            y_vol.rename(columns={"Volume": "level"}, inplace=True)
-
-            ts['vol_year'] = 0.0
+        if step == 'w':
+            # slices of every month next to each other, without the unused
+            # codes of the base-32 key (1024 columns, 36 used)
+            per_month = -(-31 // self.slice_month)
+            periods = (periods // radix - 1) * per_month + periods % radix - 1
+            n_periods = 12 * per_month
+        
+        # trend of each (year, period), zero where the period has no prices;
+        # no rows on an empty series
+        n_years = index.years.max() + 1 if len(index.years) else 0
+        matrix = np.zeros((n_years, n_periods))
+        matrix[years, periods] = index.first(step, trend)
+        
+        return years, periods, matrix
+    
+    def get_seas(self, ts, index, feats):
+        
+        if self.seas:
             
-            for c, y in y_vol[['level','year']].values:
-                
-                if self.feature == 'label':
-                    ts.loc[(ts['year'] == y) & 
-                           (ts['Volume'] > c), 'vol_year'] = 1
-                    ts.loc[(ts['year'] == y) &
-                           (ts['Volume'] < c), 'vol_year'] = -1
-
-                if self.feature == 'value':
-                    ts.loc[(ts['year'] == y), 'vol_year'] = ts['Volume'].apply(lambda x: x - c).round(2)
-
-                if self.feature == 'perc':
-                    ts.loc[(ts['year'] == y), 'vol_year'] = ts['Volume'].apply(lambda x: ((x - c) / c)*100).round(2)
-                    
-        if 'm' in self.steps and self.vol: 
-            m_vol = ts[['Volume', 'year', 'month']].groupby(['year', 'month']).mean().reset_index()
-            m_vol.rename(columns={"Volume": "level"}, inplace=True)
-
-            ts['vol_month'] = 0.0
+            for step in 'mws':
+                if step in self.steps:
+                    name = step_names[step]
+                    sea = self._shared(('seas',) + self._group_tag(step),
+                                       lambda: self.group_seas(index, feats['trd_' + name], step))
+                    self.store(feats, 'seas_' + name, index.broadcast(step, sea))
                         
-            for c, y, m in m_vol[['level','year', 'month']].values:
-                
-                if self.feature == 'label':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['month'] == m) &
-                           (ts['Volume'] > c), 'vol_month'] = 1
-                    
-                    ts.loc[(ts['year'] == y) &
-                           (ts['month'] == m) &
-                           (ts['Volume'] < c), 'vol_month'] = -1
-                
-                if self.feature == 'value':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['month'] == m), 'vol_month'] = ts['Volume'].apply(lambda x: x - c).round(2)
-                
-                if self.feature == 'perc':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['month'] == m), 'vol_month'] = ts['Volume'].apply(lambda x: ((x - c) / c)*100).round(2)
+        return feats
+    
+    def group_seas(self, index, trd, step):
         
-        if 's' in self.steps and self.vol:
+        self._count('groups', index.n_groups(step))
+        years, periods, trend = self.trend_matrix(index, trd, step)
         
-            s_vol = ts[['Volume', 'year', 'slice_year']].groupby(['year', 'slice_year']).mean().reset_index()
-            s_vol.rename(columns={"Volume": "level"}, inplace=True)
-            
-            ts['vol_slice_year'] = 0.0
+        # trends of the years before this block, if any
+        history = self._trend_history.get(step)
+        if history is not None:
+            trend = np.vstack([history, trend])
+            years = years + len(history)
         
-            for c, y, s in s_vol[['level','year', 'slice_year']].values:
-                
-                if self.feature == 'label':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['slice_year'] == s) &
-                           (ts['Volume'] > c), 'vol_slice_year'] = 1
-                    ts.loc[(ts['year'] == y) &
-                           (ts['slice_year'] == s) &
-                           (ts['Volume'] < c), 'vol_slice_year'] = -1
-                    
-                if self.feature == 'value':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['slice_year'] == s), 'vol_slice_year'] = ts['Volume'].apply(lambda x: x - c).round(2)
-                    
-                if self.feature == 'perc':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['slice_year'] == s), 'vol_slice_year'] = ts['Volume'].apply(lambda x: ((x - c) / c)*100).round(2)
+        return seasonality(trend, backend=index.backend)[years, periods]
+    
+    def intraday_changes(self, ts):
         
-        if 'w' in self.steps and self.vol:
+        close = ts['Close'].to_numpy(dtype=np.float64)
+        opening = ts['Open'].to_numpy(dtype=np.float64)
         
-            w_vol = ts[['Volume', 'year', 'month', 'slice_month']].groupby(['year', 'month', 'slice_month']).mean().reset_index()
-            w_vol.rename(columns={"Volume": "level"}, inplace=True)
-            
-            ts['vol_slice_month'] = 0.0
+        prev = np.empty(len(close))
+        prev[1:] = close[:-1]
+        prev[:1] = np.nan if self._prev_close is None else self._prev_close
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
             
-            for c, y, m, w in w_vol[['level','year', 'month', 'slice_month']].values:
+            if self.feature == 'label':
+                close_intraday = np.round(close / prev - 1, 4) * 100
+                close_intraday = np.where(close_intraday > 0.1, 1, 
+                                          np.where(close_intraday < 0.1, -1, close_intraday))
                 
-                if self.feature == 'label':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['month'] == m) &
-                           (ts['slice_month'] == w) &
-                           (ts['Volume'] > c), 'vol_slice_month'] = 1
-                    
-                    ts.loc[(ts['year'] == y) &
-                           (ts['month'] == m) &
-                           (ts['slice_month'] == w) &
-                           (ts['Volume'] < c), 'vol_slice_month'] = -1
-                    
-                if self.feature == 'value':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['month'] == m) &
-                           (ts['slice_month'] == w), 'vol_slice_month'] = ts['Volume'].apply(lambda x: x - c).round(2)
+                op_cl_intraday = np.round((opening / prev - 1) * 100, 2)
+                op_cl_intraday = np.where(op_cl_intraday > 0.1, 1, 
+                                          np.where(op_cl_intraday < 0.1, -1, op_cl_intraday))
+                
+            if self.feature == 'value':
+                close_intraday = np.round(close - prev, 2)
+                op_cl_intraday = opening - prev
                 
-                if self.feature == 'perc':
-                    ts.loc[(ts['year'] == y) &
-                           (ts['month'] == m) &
-                           (ts['slice_month'] == w), 'vol_slice_month'] = ts['Volume'].apply(lambda x: ((x - c) / c)*100).round(2)
+            if self.feature == 'perc':
+                close_intraday = np.round(close / prev - 1, 4) * 100
+                op_cl_intraday = np.round((opening / prev - 1) * 100, 2)
         
-        return ts
+        return close_intraday, op_cl_intraday
     
-    def get_seas(self, ts):
-
-        if 'm' in self.steps and self.seas:       
-            ts['seas_month'] = 0.0
-    
-            for m in ts['month'].unique():
-                mnt = []
-                sea = [0]
-                for y in ts['year'].unique():
-                    
-                    yr = ts['year'].unique()
-                    
-                    tr = ts['trd_month'].loc[(ts['year'] == y) & 
-                                             (ts['month'] == m)].unique()
-                    if not np.any(tr):
-                            tr = np.array([0])
-                    
-                    mnt.append(tr[0])
-                    
-                for x in range(1, len(mnt)):
-                    sea.append( round(( 100 * mnt[0:x].count(mnt[x]))/ len(mnt[0:x]), 2) )
-                    
-                for i in range(len(sea)):
-                    ts.loc[(ts['year'] == yr[i]) & (ts['month'] == m), 'seas_month'] = sea[i]
-                  
-                    
-        if 'w' in self.steps and self.seas:       
-            ts['seas_slice_month'] = 0.0
-    
-            for m in ts['month'].unique():
-                for w in ts['slice_month'].unique():
-                    mnt = []
-                    sea = [0]
-                    for y in ts['year'].unique():
-                        
-                        yr = ts['year'].unique()
-                        
-                        tr = ts['trd_slice_month'].loc[(ts['year'] == y) & 
-                                                       (ts['month'] == m) &
-                                                       (ts['slice_month'] == w)].unique()
-                        
-                        if not np.any(tr):
-                            tr = np.array([0])
-                        
-                        mnt.append(tr[0])
-                    
-                    for x in range(1, len(mnt)):
-                        sea.append( round(( 100 * mnt[0:x].count(mnt[x]))/ len(mnt[0:x]), 2) )
-                      
-                    for i in range(len(sea)):
-                        ts.loc[(ts['year'] == yr[i]) & (ts['month'] == m) & 
-                               (ts['slice_month'] == w), 'seas_slice_month'] = sea[i]
-        
-        if 's' in self.steps and self.seas:       
-            ts['seas_slice_year'] = 0.0
-    
-            for s in ts['slice_year'].unique():
-                mnt = []
-                sea = [0]
-                for y in ts['year'].unique():
-                    
-                    yr = ts['year'].unique()
-                    
-                    tr = ts['trd_slice_year'].loc[(ts['year'] == y) &
-                                                  (ts['slice_year'] == s)].unique()
-                    if not np.any(tr):
-                            tr = np.array([0])
-                    
-                    mnt.append(tr[0])
-                    
-                for x in range(1, len(mnt)):
-                    sea.append( round(( 100 * mnt[0:x].count(mnt[x]))/ len(mnt[0:x]), 2) )
-                    
-                for i in range(len(sea)):
-                    ts.loc[(ts['year'] == yr[i]) &
-                           (ts['slice_year'] == s), 'seas_slice_year'] = sea[i]
-                        
-        return ts
-    
-    def intraday_values(self, ts):
+    def intraday_values(self, ts, index, feats):
         
-        if self.feature == 'label' and self.osc:
+        if self.osc:
+            close_intraday, op_cl_intraday = self._shared(('osc', self.feature), lambda: self.intraday_changes(ts))
             
-            ts['close_intraday'] = 0.0
-            ts['close_intraday'] = ts['Close'].pct_change().round(decimals=4) * 100
-            ts.loc[ts['close_intraday'] > 0.1, 'close_intraday'] = 1
-            ts.loc[ts['close_intraday'] < 0.1, 'close_intraday'] = -1
+            self.store(feats, 'close_intraday', close_intraday)
+            self.store(feats, 'op_cl_intraday', op_cl_intraday)
 
-            ts['op_cl_intraday'] = 0.0
-            ts['aux'] = ts['Close'].shift(1)
-            ts['op_cl_intraday'] = ((ts[['aux', 'Open']].pct_change(axis=1))['Open'] * 100).round(2)
-            ts.loc[ts['op_cl_intraday'] > 0.1, 'op_cl_intraday'] = 1
-            ts.loc[ts['op_cl_intraday'] < 0.1, 'op_cl_intraday'] = -1
-            ts.drop(columns=['aux'], inplace = True)
-            
-        if self.feature == 'value' and self.osc:
-            
-            ts['close_intraday'] = ts['Close'].diff().round(decimals=2)
-            ts['op_cl_intraday'] = ts['Open'] - ts['Close'].shift(1)
-            
-        if self.feature == 'perc' and self.osc:
-            #ts['close_intraday'] = 0.0
-            ts['close_intraday'] = ts['Close'].pct_change().round(decimals=4) * 100
-
-            ts['aux'] = ts['Close'].shift(1)
-            ts['op_cl_intraday'] = ((ts[['aux', 'Open']].pct_change(axis=1))['Open'] * 100).round(2)
-            ts.drop(columns=['aux'], inplace = True)
-
-        return ts
-    
-    def daily_values(self, ts):
-         
-        if self.feature == 'label' and self.diff_vl:
-            diff = ts[['Open', 'Close']].pct_change(axis='columns').round(decimals=4) * 100
-            ts['open_close']= diff['Close']
-            ts.loc[ts['open_close'] > 0, 'open_close'] = 1
-            ts.loc[ts['open_close'] < 0, 'open_close'] = -1
-            
-            diff = ts[['Low', 'High']].pct_change(axis='columns').round(decimals=4) * 100
-            ts['low_high'] = diff['High']
-            ts.loc[ts['low_high'] > 0, 'low_high'] = 1
-            ts.loc[ts['low_high'] < 0, 'low_high'] = -1
+        return feats
+    
+    def daily_changes(self, ts):
+        
+        opening = ts['Open'].to_numpy(dtype=np.float64)
+        close = ts['Close'].to_numpy(dtype=np.float64)
+        low = ts['Low'].to_numpy(dtype=np.float64)
+        high = ts['High'].to_numpy(dtype=np.float64)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
             
-        if self.feature == 'value' and self.diff_vl:
-            diff = ts[['Open', 'Close']].diff(axis='columns').round(decimals=2)
-            ts['open_close']= diff['Close']
-            diff = ts[['Low', 'High']].diff(axis='columns').round(decimals=2)
-            ts['low_high'] = diff['High']
+            if self.feature == 'label':
+                open_close = np.sign(np.round(close / opening - 1, 4) * 100)
+                low_high = np.sign(np.round(high / low - 1, 4) * 100)
+                
+            if self.feature == 'value':
+                open_close = np.round(close - opening, 2)
+                low_high = np.round(high - low, 2)
             
-        if self.feature == 'perc' and self.diff_vl:
-            diff = ts[['Open', 'Close']].pct_change(axis='columns').round(decimals=4) * 100
-            ts['open_close']= diff['Close']
+            if self.feature == 'perc':
+                open_close = np.round(close / opening - 1, 4) * 100
+                low_high = np.round(high / low - 1, 4) * 100
+        
+        return open_close, low_high
+    
+    def daily_values(self, ts, index, feats):
+        
+        if self.diff_vl:
+            open_close, low_high = self._shared(('diff', self.feature), lambda: self.daily_changes(ts))
             
-            diff = ts[['Low', 'High']].pct_change(axis='columns').round(decimals=4) * 100
-            ts['low_high'] = diff['High']
+            self.store(feats, 'open_close', open_close, sign=self.feature == 'label')
+            self.store(feats, 'low_high', low_high, sign=self.feature == 'label')
         
-        return ts
+        return feats
     
-    def end_processing(self, ts):
-
-        tse = ts.drop(columns=['year', 'month', 'slice_month', 'slice_year'])
+    def lags(self):
+        
+        # lag=k lags the features 1 to k bars, lag=(k1, k2, ...) the given bars
+        if self.lag is False or self.lag is None:
+            return ()
+        
+        if isinstance(self.lag, (int, np.integer)):
+            return tuple(range(1, int(self.lag) + 1))
+        
+        return tuple(self.lag)
+    
+    def lag_window(self, feats, n_rows):
+        
+        r"""
+        Strided (features x shifts x rows) view of the features to lag.
         
-        return tse
+        The features (all by default, else ``lag_columns``) are copied once
+        into a (features x rows) array padded on the left with ``max(lags)``
+        rows: the rows of the previous block (see partial_fit), or zeros.
+        ``window[i, j]`` is feature ``i`` shifted by ``max(lags) - j`` rows,
+        so every lag is a contiguous view of the copy.
+        
+        """
+        
+        columns = list(self.lag_columns) if self.lag_columns is not None else list(feats)
+        for c in columns:
+            if c not in feats:
+                raise ValueError(
+                    "Column \"%s\" not found in the features." % c
+                    )
+        self.lag_features_ = columns
+        
+        max_lag = max(self.lags())
+        padded = np.zeros((len(columns), max_lag + n_rows), dtype=self.dtype)
+        for i, c in enumerate(columns):
+            padded[i, max_lag:] = feats[c]
+        
+        if self._prev_rows is not None:
+            prev = self._prev_rows[columns].to_numpy(dtype=self.dtype)[-max_lag:]
+            padded[:, max_lag - len(prev):max_lag] = prev.T
+        
+        return sliding_window_view(padded, n_rows, axis=1)
     
-    def custom_sum(self, feat):
+    def get_lags(self, ts, index, feats):
         
-        row = feat.drop(['Date'])
-        sum_lbs = abs(row.sum())
-        vl = 0
-        if sum_lbs > len(row)/2:
-            vl = self.bin[1]
+        if self.lag:
+            # the lags of the frame are copied out of the strided view into one
+            # (features x lags x rows) block: the columns of the view share
+            # their buffer and are read-only (lag_tensor keeps the view)
+            window = self.lag_window(feats, len(ts))
+            lags = self.lags()
+            block = window[:, window.shape[1] - 1 - np.asarray(lags)]
+            
+            for i, c in enumerate(self.lag_features_):
+                for j, k in enumerate(lags):
+                    feats['%s_lag%d' % (c, k)] = block[i, j]
+        
+        return feats
     
-        return vl
+    def end_processing(self, ts, feats):
+        
+        # the output frame is assembled once, from the input columns and the
+        # features, without copying them: the input columns are shared
+        # copy-on-write and the feature arrays belong to the frame
+        columns = {c: ts[c].fillna(0) if ts[c].hasnans else ts[c] for c in ts.columns}
+        columns.update(feats)
+        
+        return pd.DataFrame(columns, index=ts.index, copy=False)
+    
+    def votes(self, feats, bin):
+        
+        # labels equal to -bin[1] do not count, the others are summed row by row
+        total = np.zeros(len(next(iter(feats.values()))) if feats else 0)
+        for column in feats.values():
+            total += np.where(column == -bin[1], 0, column)
+        
+        return total
 
-    def extract_label(self, ts, bin=(0,1)):
+    def extract_label(self, ts, bin=(0,1), threshold=0.5, horizons=(0,)):
+        
+        r"""
+        Label each row by majority vote of its feature labels.
+        
+        A row is labeled ``bin[1]`` when more than ``threshold`` of its
+        features vote for it, and 0 otherwise. With several ``horizons``, one
+        column ``label_h`` is returned per horizon, holding the label of the
+        row ``h`` bars ahead (0 past the end of the series).
+        
+        """
 
         self.feature = 'label'
         self.seas = False
         self.trends = False
+        self.lag = False
         self.bin = bin
-        ts_cp = ts.copy()
-
-        ts_label = self.fit_transform(ts)
-        ts_lb = ts_label.replace(-self.bin[1], 0)
         
-        ts_lb.drop(['Close', 'Volume', 'Open', 'High', 'Low'], axis=1, inplace=True)
-        ts_lb['label'] = ts_lb.apply(self.custom_sum, axis = 1)
-        ts_merge = pd.merge(ts_cp, ts_lb, left_on="Date", right_on="Date")
+        self.check_params(ts)
+        with self._profiling():
+            feats = self._features(ts)
+        
+        votes = np.abs(self.votes(feats, bin))
+        label = np.where(votes > threshold * len(feats), bin[1], 0)
         
-        return ts_merge[['Date', 'Close', 'Volume', 'Open', 'High', 'Low', 'label']]
+        ts_label = ts[['Date', 'Close', 'Volume', 'Open', 'High', 'Low']].reset_index(drop=True)
+        
+        if tuple(horizons) == (0,):
+            ts_label['label'] = label
+            return ts_label
+        
+        for h in horizons:
+            ts_label['label_%d' % h] = np.concatenate([label[h:], np.zeros(min(h, len(label)), dtype=label.dtype)])
+        
+        return ts_label
     
-    def fit_transform(self, ts):
+    def get_params(self):
+        
+        return {'mult': self.mult,
+                'levels': self.levels,
+                'trends': self.trends,
+                'seas': self.seas,
+                'vol': self.vol,
+                'osc': self.osc,
+                'lag': self.lag,
+                'diff_vl': self.diff_vl,
+                'label': self.label,
+                'feature': self.feature,
+                'steps': self.steps,
+                'slice_month': self.slice_month,
+                'slice_year': self.slice_year,
+                'dtype': self.dtype,
+                'backend': self.backend,
+                'cache': self.cache,
+                'cache_size': self.cache_size,
+                'profile': self.profile,
+                'logger': self.logger,
+                'windows': self.windows,
+                'lag_columns': self.lag_columns,
+                'n_jobs': self.n_jobs,
+                'base_freq': self.base_freq}
+    
+    def check_params(self, ts):
         
         if isinstance(ts, str):
             raise ValueError(
@@ -537,28 +542,698 @@ class tsf_vectorizer:
             raise ValueError(
                 "The parameter \"features\" should be \"perc\", \"value\" or \"label\""
                 )
-              
+            
+        if np.dtype(self.dtype) not in [np.float32, np.float64]:
+            raise ValueError(
+                "The parameter \"dtype\" should be \"float32\" or \"float64\""
+                )
+            
+        if self.backend not in ['numpy', 'numba']:
+            raise ValueError(
+                "The parameter \"backend\" should be \"numpy\" or \"numba\""
+                )
+            
+        if not all(isinstance(k, (int, np.integer)) and k > 0 for k in self.lags()):
+            raise ValueError(
+                "The parameter \"lag\" should be False, a number of lags or a tuple of lags (bars)"
+                )
+            
+        if not all(isinstance(w, (int, np.integer)) and w > 0 for w in self.windows):
+            raise ValueError(
+                "The parameter \"windows\" should be a tuple of positive integers (bars)"
+                )
+            
+        if self.n_jobs is not None and not (isinstance(self.n_jobs, (int, np.integer)) and self.n_jobs > 0):
+            raise ValueError(
+                "The parameter \"n_jobs\" should be None or a positive integer"
+                )
+            
+        if self.base_freq is not None:
+            try:
+                # fixed frequencies only (dates are floored to the bars)
+                start = pd.Timestamp(0).floor(self.base_freq)
+                nanos = (start + pd.tseries.frequencies.to_offset(self.base_freq) - start).value
+            except (TypeError, ValueError):
+                nanos = 0
+            if nanos <= 0 or (24 * 3600 * 10 ** 9) % nanos:
+                raise ValueError(
+                    "The parameter \"base_freq\" should be None or a frequency that divides a day (\"D\", \"4h\", \"15min\", ...)"
+                    )
+            
+        if self.cache is not None and not isinstance(self.cache, (str, os.PathLike)):
+            raise ValueError(
+                "The parameter \"cache\" should be None or the path of a directory"
+                )
+    
+    def _group_tag(self, step):
+        
+        # the groups of a step only depend on the slice parameters among its
+        # keys, and on the bars they are computed on
+        return (step, self.base_freq) + tuple(getattr(self, k) for k in step_keys[step] if k.startswith('slice'))
+    
+    def _shared(self, key, compute):
+        
+        # results shared by the configurations of a sweep
+        if self._memo is None:
+            return compute()
+        
+        if key not in self._memo:
+            self._memo[key] = compute()
+        
+        return self._memo[key]
+    
+    def _features(self, ts):
+        
+        # with base_freq, the calendar groups are built on the resampled bars
+        # (see _bar_features)
+        steps = self.steps if self._memo is None else 'wmsy'
+        with self._timed('pre_processing', len(ts)):
+            frame, bars = self._shared(('bars', self.base_freq),
+                                       lambda: (ts, None) if self.base_freq is None else self.resample(ts))
+            # a sweep shares one index over every step per slicing
+            index = self._shared(('index', self.slice_month, self.slice_year, self.base_freq),
+                                 lambda: GroupIndex(self.pre_processing(frame), steps, get_backend(self.backend)))
+        
         if self.mult:
             
-            ts = self.pre_processing(ts)
-            ts = self.intraday_values(ts)     
-            ts = self.daily_values(ts)   
-            ts = self.get_vol(ts) 
-            ts = self.get_trends(ts)    # Melhorar: talvez colocar erro
-            ts = self.get_seas(ts)      
-            ts = self.get_level(ts)      
-            ts = self.end_processing(ts)        
+            stages = [self.intraday_values, self.daily_values, self.get_vol,
+                      self.get_trends, self.get_seas, self.get_level, self.get_lags]    # Melhorar: talvez colocar erro
            
         else:
             
-            ts = self.pre_processing(ts)
-            ts = self.intraday_values(ts)
-            ts = self.get_level(ts)
-            ts = self.get_trends(ts)
-            ts = self.get_seas(ts)
-            ts = self.end_processing(ts)
+            stages = [self.intraday_values, self.get_level, self.get_trends,
+                      self.get_seas, self.get_lags]
+        
+        stages = [stage for stage in stages if getattr(self, stage_flags[stage.__name__])]
+        
+        if bars is not None:
+            return self._bar_features(stages, ts, frame, bars, index)
+        
+        return self._compute(stages, ts, index)
+    
+    def _bar_features(self, stages, ts, frame, bars, index):
+        
+        # calendar stages run on the bars and are broadcast to their rows;
+        # they come after the other stages (but lags) in both stage orders
+        coarse = [stage for stage in stages if stage.__name__ in calendar_stages]
+        fine = [stage for stage in stages if stage not in coarse and stage != self.get_lags]
+        
+        feats = self._compute(fine, ts, index)
+        for c, values in self._compute(coarse, frame, index).items():
+            feats[c] = values[bars]
+        
+        if self.get_lags in stages:
+            feats = self._stage(self.get_lags, ts, index, feats)
+        
+        return feats
+    
+    def _compute(self, stages, ts, index):
+        
+        n_jobs = self.n_jobs or os.cpu_count() or 1
+        
+        # profiled stages run one at a time, so timings and memory are their own
+        if n_jobs == 1 or len(stages) < 2 or self._run is not None:
+            feats = {}
+            for stage in stages:
+                feats = self._stage(stage, ts, index, feats)
+            return feats
+        
+        return self._run_stages(stages, ts, index, n_jobs)
+    
+    def _run_stages(self, stages, ts, index, n_jobs):
+        
+        # stages run on a thread pool as soon as the stages they read are
+        # done; each one writes its own columns, merged in the order of the
+        # stages, so the features are the same as when run one at a time
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+        
+        names = [stage.__name__ for stage in stages]
+        pending = dict(zip(names, stages))
+        running = {}
+        out = {}
+        
+        with ThreadPoolExecutor(min(n_jobs, len(stages))) as pool:
+            while pending or running:
+                for name in list(pending):
+                    inputs = stage_inputs.get(name, ())
+                    if all(d in out for d in inputs if d in names):
+                        feats = {c: v for d in names if d in inputs and d in out for c, v in out[d].items()}
+                        before = set(feats)
+                        future = pool.submit(self._stage, pending.pop(name), ts, index, feats)
+                        running[future] = name, before
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, before = running.pop(future)
+                    out[name] = {c: v for c, v in future.result().items() if c not in before}
+        
+        return {c: v for name in names for c, v in out[name].items()}
+    
+    def _feature_cache(self):
+        
+        if self.cache is None:
+            return None
+        
+        if self._cache_store is None or self._cache_store.path != os.path.expanduser(os.fspath(self.cache)):
+            self._cache_store = FeatureCache(self.cache, self.cache_size)
+        self._cache_store.max_bytes = self.cache_size
+        
+        return self._cache_store
+    
+    @contextmanager
+    def _profiling(self):
+        
+        if not self.profile:
+            yield
+            return
+        
+        self._run = RunStats(self.profile if callable(self.profile) else None, self.logger)
+        self._run.start()
+        try:
+            yield
+        finally:
+            self._run.stop()
+            self._last_run, self._run = self._run, None
+    
+    def _timed(self, name, rows):
+        
+        return nullcontext() if self._run is None else self._run.stage(name, rows)
+    
+    def _count(self, name, n):
+        
+        if self._run is not None:
+            self._run.count(name, n)
+    
+    def _stage(self, stage, ts, index, feats):
+        
+        with self._timed(stage.__name__, len(ts)):
+            return self._cached_stage(stage, ts, index, feats)
+    
+    def _cached_stage(self, stage, ts, index, feats):
+        
+        # columns of a stage are cached by the fingerprint of the block and
+        # of the years before it, and by the parameters the stage depends on
+        # (lags are a cheap view of the other stages and are not cached)
+        cache = self._feature_cache()
+        if cache is None or self._fingerprint is None or stage == self.get_lags:
+            return stage(ts, index, feats)
+        
+        key = cache.key(self._fingerprint, stage.__name__, self.feature, self.steps,
+                        self.slice_month, self.slice_year, np.dtype(self.dtype).name,
+                        tuple(self.windows), self.base_freq)
+        columns = cache.get(key)
+        
+        if columns is None:
+            before = set(feats)
+            feats = stage(ts, index, feats)
+            columns = {c: v for c, v in feats.items() if c not in before}
+            cache.put(key, columns)
+        else:
+            feats.update(columns)
+        
+        return feats
+    
+    def _transform(self, ts):
+        
+        feats = self._features(ts)
+        with self._timed('end_processing', len(ts)):
+            return self.end_processing(ts, feats)
+    
+    def _cached_transform(self, ts):
+        
+        # rows sorted by year are split into the closed years and the open
+        # (last) year, so rows appended to a series only recompute the open year
+        years = self.pre_processing(ts)['year']
+        bounds = [0, len(ts)]
+        if np.all(np.diff(years) >= 0) and years[0] != years[-1]:
+            bounds.insert(1, np.searchsorted(years, years[-1]))
+        
+        out = []
+        tail, history, fp = None, {}, b''
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            block = ts.iloc[a:b]
+            fp = fingerprint(block, fp)
+            
+            self._fingerprint = fp
+            try:
+                out.append(self._transform_year(block, tail, history))
+            finally:
+                self._fingerprint = None
+                
+            if b < len(ts):
+                history = self._carry_trends(block, out[-1], history)
+                tail = self._carry_rows(tail, block, out[-1])
+        
+        return out[0] if len(out) == 1 else pd.concat(out)
+    
+    def fit_transform(self, ts):
+        
+        self.check_params(ts)
+        
+        if is_frame(ts):
+            return transform_polars(self, ts)
+        
+        with self._profiling():
+            if self.cache is not None and len(ts):
+                return self._cached_transform(ts)
+            
+            return self._transform(ts)
+    
+    def sweep(self, ts, grid, frame=False):
+        
+        r"""
+        Extract the features of every combination of parameters in ``grid``.
+        
+        ``grid`` maps parameter names to lists of values, for example
+        ``{'feature': ['perc', 'label'], 'slice_month': [10, 15]}``; the other
+        parameters are the ones of this vectorizer. Work is shared between
+        combinations: the group means, trends and seasonality of a step are
+        computed once per slicing and rendered for every ``feature``.
+        
+        Returns a dict keyed by the tuple of grid values of each combination,
+        or, with ``frame=True``, a DataFrame with one column level per grid
+        parameter.
+        
+        """
+        
+        params = self.get_params()
+        for name in grid:
+            if name not in params:
+                raise ValueError(
+                    "Unknown parameter \"%s\" in the grid." % name
+                    )
+        
+        memo = {}
+        out = {}
+        for values in product(*grid.values()):
+            tsf = tsf_vectorizer(**dict(params, **dict(zip(grid, values))))
+            tsf.check_params(ts)
+            tsf._memo = memo
+            out[values] = tsf._transform(ts)
+        
+        if frame:
+            return pd.concat(out, axis=1, names=list(grid) + [None])
+        
+        return out
+    
+    def lag_tensor(self, ts):
+        
+        r"""
+        Lagged features of ``ts`` as a (rows x features x lags) array.
+        
+        Features are ordered as ``lag_features_`` and lags as in ``lag``.
+        When the lags are 1 to k, the array is a strided view of a single
+        padded copy of the features (see ``lag_window``), with no copy per lag.
+        
+        """
+        
+        self.check_params(ts)
+        
+        if not self.lag:
+            raise ValueError(
+                "The parameter \"lag\" should be set to build lagged features."
+                )
+        
+        lag, self.lag = self.lag, False
+        try:
+            feats = self._features(ts)
+        finally:
+            self.lag = lag
         
-        ts.fillna(0, inplace=True)
+        lags = self.lags()
+        window = self.lag_window(feats, len(ts)).transpose(2, 0, 1)
+        if lags == tuple(range(1, len(lags) + 1)):
+            return window[:, :, len(lags) - 1::-1]
         
-        return ts
+        return window[:, :, window.shape[2] - 1 - np.asarray(lags)]
     
+    @property
+    def last_run_stats_(self):
+        
+        if self._last_run is None:
+            raise ValueError(
+                "No profiled run, set the parameter \"profile\" first."
+                )
+        
+        return self._last_run.stages
+    
+    @property
+    def cache_stats_(self):
+        
+        cache = self._feature_cache()
+        if cache is None:
+            raise ValueError(
+                "The cache is disabled, set the parameter \"cache\" first."
+                )
+        
+        return cache.info()
+    
+    def _transform_year(self, raw, tail, history):
+        
+        # every calendar group is inside a year, so a year only needs the
+        # last rows (trailing windows, last close) and the trends of the
+        # previous years
+        self._prev_rows = tail
+        self._prev_close = None if tail is None else tail['Close'].iloc[-1]
+        self._trend_history = history
+        try:
+            return self._transform(raw)
+        finally:
+            self._prev_rows = None
+            self._prev_close = None
+            self._trend_history = {}
+    
+    def _carry_rows(self, tail, raw, out):
+        
+        # the rows the next block needs: its trailing windows, lags and last close
+        n_rows = max([1] + [w - 1 for w in self.windows] + list(self.lags()))
+        columns = ('Close', 'Volume') if self.base_freq is None else ('Date', 'Close', 'Volume')
+        rows = raw[[c for c in columns if c in raw.columns]]
+        if self.lag:
+            rows = pd.concat([rows, out[self.lag_features_]], axis=1)
+        rows = rows if tail is None else pd.concat([tail, rows])
+        
+        if self.base_freq is not None and self.windows:
+            # windows count bars: keep the rows of the last bars
+            bars = self.resample(rows)[1]
+            n_rows = max(n_rows, int(np.sum(bars > bars[-1] - max(self.windows) + 1)))
+        
+        return rows.tail(n_rows)
+    
+    def _carry_trends(self, raw, out, history):
+        
+        # trend rows of a closed year, appended to the history of each period
+        if not (self.seas and self.trends):
+            return history
+        
+        history = dict(history)
+        first = slice(None)
+        if self.base_freq is not None:
+            # trends of the bars, from the first row of each bar
+            raw, bars = self.resample(raw)
+            first = np.flatnonzero(np.diff(bars, prepend=-1))
+        
+        index = GroupIndex(self.pre_processing(raw), self.steps, get_backend(self.backend))
+        for step in 'mws':
+            if step in self.steps:
+                trd = out['trd_' + step_names[step]].to_numpy()[first]
+                trend = self.trend_matrix(index, trd, step)[2]
+                history[step] = trend if step not in history else np.vstack([history[step], trend])
+        
+        return history
+    
+    def _close_year(self):
+        
+        if self._open_out is None:
+            self._open_out = self._transform_year(self._open, self._tail, self._history)
+        
+        self._history = self._carry_trends(self._open, self._open_out, self._history)
+        self._closed.append(self._open_out)
+        self._n_closed += len(self._open)
+        self._tail = self._carry_rows(self._tail, self._open, self._open_out)
+        self._open = self._open.iloc[:0]
+        self._open_out = None
+    
+    def _check_rows(self, ts):
+        
+        # new rows need the columns used by the parameters and those of the
+        # rows already fitted, and dates sorted and not older than the last one
+        required = ['Date', 'Close'] + ['Open'] * bool(self.osc)
+        if self.mult:
+            required += ['High', 'Low'] * bool(self.diff_vl) + ['Volume'] * bool(self.vol)
+        if self._open is not None:
+            required += [c for c in self._open.columns if c not in required]
+        missing = [c for c in required if c not in ts.columns]
+        if missing:
+            raise ValueError(
+                "The new rows have no column %s." % ', '.join('"%s"' % c for c in missing)
+                )
+        
+        dates = as_datetime(ts['Date'])
+        if not dates.is_monotonic_increasing:
+            raise ValueError(
+                "New rows must be sorted by Date."
+                )
+        if len(ts) and self._last_date is not None and dates.iloc[0] < self._last_date:
+            raise ValueError(
+                "New rows must not be older than the rows already fitted."
+                )
+        
+        return dates
+    
+    def partial_fit(self, ts):
+        
+        r"""
+        Append new rows (sorted by Date) to the series seen so far.
+        
+        Only the open year is recomputed: closed years keep their features,
+        and the seasonality of the open year uses the trends kept for each
+        period of the previous years. The final frame, ``features_``, is
+        the same as ``fit_transform`` over all rows seen.
+        
+        """
+        
+        self.check_params(ts)
+        
+        # the new rows are checked before any change of the state: rows that
+        # fail leave the rows fitted so far as they were
+        dates = self._check_rows(ts)
+        
+        n_seen = 0 if self._open is None else self._n_closed + len(self._open)
+        ts = ts.reset_index(drop=True)
+        ts.index = ts.index + n_seen
+        
+        if self._open is None:
+            self._open = ts.iloc[:0]
+        
+        if len(ts) == 0:
+            return self
+        
+        self._last_date = dates.max()
+        
+        years = self.pre_processing(ts)['year']
+        for year in pd.unique(years):
+            if len(self._open) and self._open_year != year:
+                self._close_year()
+            rows = ts[years == year]
+            self._open = pd.concat([self._open, rows]) if len(self._open) else rows
+            self._open_year = year
+            self._open_out = None
+        
+        self._open_out = self._transform_year(self._open, self._tail, self._history)
+        
+        return self
+    
+    def transform_new(self, ts):
+        
+        self.partial_fit(ts)
+        
+        if len(ts) <= len(self._open_out):
+            return self._open_out.tail(len(ts))
+        
+        return self.features_.tail(len(ts))
+    
+    @property
+    def features_(self):
+        
+        if self._open is None:
+            raise ValueError(
+                "No rows were fitted, call partial_fit first."
+                )
+        
+        if self._open_out is None and len(self._open):
+            # open year of a loaded state
+            self._open_out = self._transform_year(self._open, self._tail, self._history)
+        
+        blocks = self._closed + ([self._open_out] if self._open_out is not None else [])
+        if not blocks:
+            # only empty frames were fitted
+            return self._transform_year(self._open, self._tail, self._history)
+        
+        return pd.concat(blocks)
+    
+    def fit(self, ts):
+        
+        r"""
+        Fit the state needed to extract features of later rows.
+        
+        The state is what ``partial_fit`` keeps of the history: the rows of
+        the open (last) year, whose groups new rows may join, the last rows
+        before it (last close, trailing windows and lags) and the trends of
+        every period of the closed years, for seasonality. ``transform``
+        applies it to new rows and ``save`` writes it to a file.
+        
+        """
+        
+        params = self.get_params()
+        self.__init__(**params)
+        
+        return self.partial_fit(ts)
+    
+    def transform(self, ts):
+        
+        r"""
+        Features of rows following the fitted ones, as ``fit_transform`` of
+        the whole series would give them. The state is not changed.
+        
+        """
+        
+        if self._open is None:
+            raise ValueError(
+                "No rows were fitted, call fit or load first."
+                )
+        
+        tsf = tsf_vectorizer(**self.get_params())
+        for name in ('_n_closed', '_open', '_open_out', '_open_year', '_tail', '_last_date'):
+            setattr(tsf, name, getattr(self, name))
+        tsf._history = dict(self._history)
+        if hasattr(self, 'lag_features_'):
+            tsf.lag_features_ = self.lag_features_
+        
+        return tsf.transform_new(ts)
+    
+    def save(self, path):
+        
+        r"""
+        Write the fitted state (see ``fit``) and the parameters to an
+        uncompressed ``.npz`` file, read back with ``tsf_vectorizer.load``.
+        Parameters that are not plain values (``logger``, a ``profile``
+        callback) are not saved.
+        
+        """
+        
+        if self._open is None:
+            raise ValueError(
+                "No rows were fitted, call fit first."
+                )
+        
+        params = {k: v for k, v in self.get_params().items() if k != 'logger'}
+        params['profile'] = bool(params['profile'])
+        params['dtype'] = np.dtype(params['dtype']).name
+        if params['cache'] is not None:
+            params['cache'] = os.fspath(params['cache'])
+        
+        meta = {'params': params,
+                'n_closed': self._n_closed,
+                'index': int(self._open.index[0]) if len(self._open) else self._n_closed,
+                'open_year': None if self._open_year is None else int(self._open_year),
+                'last_date': None if self._last_date is None else self._last_date.isoformat(),
+                'lag_features': getattr(self, 'lag_features_', None),
+                'open': list(self._open.columns),
+                'tail': None if self._tail is None else list(self._tail.columns),
+                'history': list(self._history),
+                'tz': {}}
+        
+        arrays = {}
+        for part, frame in (('open', self._open), ('tail', self._tail)):
+            for i, c in enumerate([] if frame is None else frame.columns):
+                values = frame[c]
+                if isinstance(values.dtype, pd.DatetimeTZDtype):
+                    meta['tz']['%s/%d' % (part, i)] = str(values.dt.tz)
+                    values = values.dt.tz_convert('UTC').dt.tz_localize(None)
+                values = values.to_numpy()
+                arrays['%s/%d' % (part, i)] = values.astype(str) if values.dtype == object else values
+        for step, trend in self._history.items():
+            arrays['history/' + step] = trend
+        
+        # numpy integers and tuples (lags, windows) are written as numbers and lists
+        meta = json.dumps(meta, default=lambda v: v.item() if isinstance(v, np.generic) else list(v))
+        np.savez(path, meta=np.array(meta), **arrays)
+    
+    @classmethod
+    def load(cls, path):
+        
+        r"""
+        Vectorizer with the parameters and fitted state saved by ``save``,
+        ready to ``transform`` new rows. ``features_`` then holds the open
+        year and the rows transformed after it.
+        
+        """
+        
+        with np.load(path, allow_pickle=False) as f:
+            meta = json.loads(str(f['meta']))
+            arrays = {name: f[name] for name in f.files if name != 'meta'}
+        
+        params = meta['params']
+        for name in ('windows', 'lag'):
+            if isinstance(params[name], list):
+                params[name] = tuple(params[name])
+        tsf = cls(**params)
+        
+        frames = {}
+        for part in ('open', 'tail'):
+            if meta[part] is None:
+                continue
+            columns = {}
+            for i, c in enumerate(meta[part]):
+                values = pd.Series(arrays['%s/%d' % (part, i)])
+                tz = meta['tz'].get('%s/%d' % (part, i))
+                columns[c] = values if tz is None else values.dt.tz_localize('UTC').dt.tz_convert(tz)
+            frames[part] = pd.DataFrame(columns, columns=meta[part])
+        
+        tsf._open = frames['open']
+        tsf._open.index = tsf._open.index + meta['index']
+        tsf._tail = frames.get('tail')
+        tsf._n_closed = meta['n_closed']
+        tsf._open_year = meta['open_year']
+        tsf._last_date = None if meta['last_date'] is None else pd.Timestamp(meta['last_date'])
+        tsf._history = {step: arrays['history/' + step] for step in meta['history']}
+        if meta['lag_features'] is not None:
+            tsf.lag_features_ = meta['lag_features']
+        
+        return tsf
+    
+    def fit_transform_panel(self, panel, symbol='Symbol', n_jobs=None, executor='process', chunksize=1):
+        
+        r"""
+        Extract the features of many symbols at once.
+        
+        ``panel`` is a long-format DataFrame with a ``symbol`` column or a
+        dict of DataFrames keyed by symbol; each symbol is transformed on its
+        own, in ``n_jobs`` processes (``executor='process'``) or threads,
+        without ``logger`` and ``profile``.
+        
+        """
+        
+        from ts_features._panel import transform_panel
+        
+        self.check_params(panel)
+        
+        return transform_panel(self, panel, symbol=symbol, n_jobs=n_jobs,
+                               executor=executor, chunksize=chunksize)
+    
+    def iter_transform(self, source, chunksize=100000):
+        
+        r"""
+        Extract features from a CSV or Parquet file (or an iterable of
+        DataFrames) sorted by Date, one year at a time.
+        
+        The file is read in chunks of ``chunksize`` rows and regrouped by
+        year; each year is transformed with the last rows and the trend
+        history of the previous years, so the concatenated output equals
+        ``fit_transform`` on the whole series while memory holds one year.
+        
+        """
+        
+        from ts_features._io import read_chunks, year_blocks
+        
+        self.check_params(None)
+        
+        tail, history = None, {}
+        for block in year_blocks(read_chunks(source, chunksize)):
+            out = self._transform_year(block, tail, history)
+            history = self._carry_trends(block, out, history)
+            tail = self._carry_rows(tail, block, out)
+            yield out
+    
+    def transform_file(self, source, dest, chunksize=100000):
+        
+        r"""
+        Stream the features of ``source`` (see ``iter_transform``) to a
+        Parquet or CSV file ``dest``. Returns the number of rows written.
+        
+        """
+        
+        from ts_features._io import write_frames
+        
+        return write_frames(self.iter_transform(source, chunksize), dest)
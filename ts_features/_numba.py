@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import numpy as np
+from numba import njit, prange
+
+from ts_features._kernels import mk_sort_size
+
+# Numba versions of the segmented kernels of ts_features._kernels. Values
+# come grouped contiguously, with group g in values[offsets[g]:offsets[g + 1]].
+# Functions are compiled on first use and cached on disk.
+
+
+@njit(cache=True, parallel=True)
+def group_mean(values, offsets):
+
+    n_groups = len(offsets) - 1
+    out = np.empty(n_groups)
+
+    for g in prange(n_groups):
+        # compensated sum in row order, as pandas does, for identical means
+        total = 0.0
+        comp = 0.0
+        count = 0
+        for i in range(offsets[g], offsets[g + 1]):
+            val = values[i]
+            if val == val:
+                count += 1
+                y = val - comp
+                t = total + y
+                comp = t - total - y
+                if comp != comp:
+                    comp = 0.0
+                total = t
+        out[g] = total / count if count > 0 else np.nan
+
+    return out
+
+
+@njit(cache=True, parallel=True)
+def mk_stats(x, offsets):
+
+    n_groups = len(offsets) - 1
+    s = np.zeros(n_groups)
+    n = np.zeros(n_groups)
+    ties = np.zeros(n_groups)
+
+    for g in prange(n_groups):
+        seg = x[offsets[g]:offsets[g + 1]]
+        seg = seg[~np.isnan(seg)]
+        m = len(seg)
+
+        srt = np.sort(seg)
+        tie = 0.0
+        tied = 0.0
+        run = 1.0
+        for i in range(1, m + 1):
+            if i < m and srt[i] == srt[i - 1]:
+                run += 1.0
+            else:
+                tie += run * (run - 1) * (2 * run + 5)
+                tied += run * (run - 1) / 2
+                run = 1.0
+
+        if m > mk_sort_size:
+            # all pairs - tied pairs - 2 * discordant pairs
+            total = m * (m - 1) / 2 - tied - 2 * inversions(seg)
+        else:
+            total = 0.0
+            for i in range(m - 1):
+                for j in range(i + 1, m):
+                    if seg[j] > seg[i]:
+                        total += 1.0
+                    elif seg[j] < seg[i]:
+                        total -= 1.0
+
+        s[g] = total
+        n[g] = m
+        ties[g] = tie
+
+    return s, n, ties
+
+
+@njit(cache=True)
+def inversions(seg):
+
+    # pairs i < j with seg[i] > seg[j], counted by a bottom-up merge sort
+    m = len(seg)
+    a = seg.copy()
+    b = np.empty(m)
+    total = 0.0
+
+    width = 1
+    while width < m:
+        for lo in range(0, m, 2 * width):
+            mid = min(lo + width, m)
+            hi = min(lo + 2 * width, m)
+            i, j, k = lo, mid, lo
+            while i < mid or j < hi:
+                if j == hi or (i < mid and a[i] <= a[j]):
+                    b[k] = a[i]
+                    i += 1
+                else:
+                    # every value left in the left block is greater
+                    b[k] = a[j]
+                    total += mid - i
+                    j += 1
+                k += 1
+        a, b = b, a
+        width *= 2
+
+    return total
+
+
+@njit(cache=True, parallel=True)
+def same_counts(trend):
+
+    n_years, n_periods = trend.shape
+    same = np.zeros((n_years, n_periods), dtype=np.int64)
+
+    for p in prange(n_periods):
+        counts = np.zeros(3, dtype=np.int64)
+        for y in range(n_years):
+            c = int(trend[y, p]) + 1
+            same[y, p] = counts[c]
+            counts[c] += 1
+
+    return same
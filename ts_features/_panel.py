@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import multiprocessing
+import os
+from concurrent.futures import (Executor, FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from itertools import islice
+
+import pandas as pd
+
+
+def _process_context():
+
+    # workers are started by a fork server (or spawned), not forked from this
+    # process: a fork copies the thread pools of Numba, Polars or BLAS, which
+    # are not fork-safe, and may hang the workers or this process at exit
+    methods = multiprocessing.get_all_start_methods()
+
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _transform_chunk(params, chunk, symbol):
+
+    from ts_features._model import tsf_vectorizer
+
+    out = []
+    for key, ts in chunk:
+        tsf = tsf_vectorizer(**params)
+        ts = tsf.fit_transform(ts.reset_index(drop=True))
+        ts.insert(0, symbol, key)
+        out.append(ts)
+
+    return out
+
+
+def transform_panel(tsf, panel, symbol='Symbol', n_jobs=None, executor='process', chunksize=1):
+
+    r"""
+    Run ``tsf.fit_transform`` on every symbol of a panel.
+
+    ``panel`` is a long-format DataFrame with a ``symbol`` column, or a dict
+    of DataFrames keyed by symbol. Chunks of ``chunksize`` symbols are run
+    on ``executor`` ('process', 'thread' or a ``concurrent.futures.Executor``)
+    with at most ``2 * n_jobs`` chunks in flight, and the results are
+    concatenated in input order with the symbol as first column.
+
+    """
+
+    if isinstance(executor, str) and executor not in ['process', 'thread']:
+        raise ValueError(
+            "The parameter \"executor\" should be \"process\", \"thread\" or an Executor"
+            )
+
+    if isinstance(panel, dict):
+        parts = iter(panel.items())
+    else:
+        if symbol not in panel.columns:
+            raise ValueError(
+                "Column \"%s\" not found in the panel." % symbol
+                )
+        parts = ((key, ts.drop(columns=[symbol])) for key, ts in panel.groupby(symbol, sort=False))
+
+    chunks = iter(lambda: list(islice(parts, chunksize)), [])
+    # the logger and a profile callback may not be picklable, and the runs of
+    # the workers are not reported back: symbols are run without them
+    params = dict(tsf.get_params(), logger=None, profile=False)
+    n_jobs = n_jobs or os.cpu_count() or 1
+
+    if n_jobs == 1 and isinstance(executor, str):
+        frames = [ts for chunk in chunks for ts in _transform_chunk(params, chunk, symbol)]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    if isinstance(executor, Executor):
+        pool = executor
+    elif executor == 'process':
+        pool = ProcessPoolExecutor(n_jobs, mp_context=_process_context())
+    else:
+        pool = ThreadPoolExecutor(n_jobs)
+
+    results = {}
+    pending = {}
+    try:
+        for i, chunk in enumerate(chunks):
+            # bound the number of chunks held in memory by the pool
+            if len(pending) >= 2 * n_jobs:
+                done = wait(pending, return_when=FIRST_COMPLETED)[0]
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+            pending[pool.submit(_transform_chunk, params, chunk, symbol)] = i
+
+        for future, i in pending.items():
+            results[i] = future.result()
+    finally:
+        if pool is not executor:
+            pool.shutdown()
+
+    frames = [ts for i in sorted(results) for ts in results[i]]
+
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
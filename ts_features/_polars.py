@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import numpy as np
+import pandas as pd
+
+from ts_features._calendar import calendar, step_names
+from ts_features._groups import GroupIndex
+from ts_features._kernels import get_backend
+
+
+def is_frame(ts):
+
+    # polars.DataFrame or pyarrow.Table, without importing either
+    module = type(ts).__module__
+    return module.startswith('polars') or (module.startswith('pyarrow') and hasattr(ts, 'column_names'))
+
+
+def _import_polars():
+
+    try:
+        import polars as pl
+    except ImportError:
+        raise ImportError(
+            "Polars DataFrames and Arrow Tables require polars."
+            )
+
+    return pl
+
+
+def _round(x, decimals):
+
+    # half to even, as np.round
+    return x.round(decimals, mode='half_to_even')
+
+
+def _store(pl, tsf, x, name, sign=False):
+
+    # columns holding only -1/0/1 are int8; missing values are filled with 0
+    # by ``transform_polars``, on the computed column: ``fill_nan`` of an
+    # expression would evaluate it once more
+    dtype = pl.Int8 if sign else (pl.Float32 if np.dtype(tsf.dtype) == np.float32 else pl.Float64)
+
+    return x.alias(name), dtype
+
+
+def _signs(pl, x, level):
+
+    # polars sorts NaN above every number: as nulls, missing values compare
+    # false both ways and are labeled 0, as in pandas
+    x = x.fill_nan(None)
+
+    return pl.when(x > level).then(1.0).when(x < level).then(-1.0).otherwise(0.0)
+
+
+def _deviation(pl, tsf, x, level):
+
+    if tsf.feature == 'label':
+        return _signs(pl, x, level)
+
+    if tsf.feature == 'value':
+        return _round(x - level, 2)
+
+    return _round(((x - level) / level) * 100, 2)
+
+
+def _intraday(pl, tsf):
+
+    close, opening = pl.col('Close'), pl.col('Open')
+    prev = close.shift(1)
+
+    if tsf.feature == 'value':
+        close_intraday = _round(close - prev, 2)
+        op_cl_intraday = opening - prev
+    else:
+        close_intraday = _round(close / prev - 1, 4) * 100
+        op_cl_intraday = _round((opening / prev - 1) * 100, 2)
+
+    if tsf.feature == 'label':
+        close_intraday, op_cl_intraday = close_intraday.fill_nan(None), op_cl_intraday.fill_nan(None)
+        close_intraday = pl.when(close_intraday > 0.1).then(1.0).when(close_intraday < 0.1).then(-1.0).otherwise(close_intraday)
+        op_cl_intraday = pl.when(op_cl_intraday > 0.1).then(1.0).when(op_cl_intraday < 0.1).then(-1.0).otherwise(op_cl_intraday)
+
+    return [_store(pl, tsf, close_intraday, 'close_intraday'),
+            _store(pl, tsf, op_cl_intraday, 'op_cl_intraday')]
+
+
+def _daily(pl, tsf):
+
+    close, opening, low, high = pl.col('Close'), pl.col('Open'), pl.col('Low'), pl.col('High')
+
+    if tsf.feature == 'value':
+        open_close = _round(close - opening, 2)
+        low_high = _round(high - low, 2)
+    else:
+        open_close = _round(close / opening - 1, 4) * 100
+        low_high = _round(high / low - 1, 4) * 100
+
+    if tsf.feature == 'label':
+        open_close, low_high = open_close.sign(), low_high.sign()
+
+    sign = tsf.feature == 'label'
+
+    return [_store(pl, tsf, open_close, 'open_close', sign),
+            _store(pl, tsf, low_high, 'low_high', sign)]
+
+
+def _levels(pl, tsf, column, prefix, means):
+
+    out = []
+    x = pl.col(column)
+    for step in 'ymsw':
+        if step in tsf.steps:
+            # missing values are skipped by the group mean, as in pandas;
+            # means are computed once, as columns, before the features
+            name = 'mean_%s_%s' % (column, step)
+            means[name] = x.fill_nan(None).mean().over('key_' + step).alias(name)
+            out.append(_store(pl, tsf, _deviation(pl, tsf, x, pl.col(name)), prefix + step_names[step],
+                              sign=tsf.feature == 'label'))
+
+    return out
+
+
+def _trends(pl, tsf, index, close, trends):
+
+    out = []
+    for step in 'ymws':
+        if step in tsf.steps:
+            trends[step] = index.broadcast(step, tsf.group_trends(index, close, step))
+            out.append((pl.lit(pl.Series('trd_' + step_names[step], trends[step])), pl.Int8))
+
+    return out
+
+
+def _seas(pl, tsf, index, trends):
+
+    out = []
+    for step in 'mws':
+        if step in tsf.steps:
+            sea = index.broadcast(step, tsf.group_seas(index, trends[step], step))
+            out.append(_store(pl, tsf, pl.lit(pl.Series(sea)), 'seas_' + step_names[step]))
+
+    return out
+
+
+def transform_polars(tsf, ts):
+
+    r"""
+    ``tsf.fit_transform`` of a ``polars.DataFrame`` or ``pyarrow.Table``.
+
+    The intraday, daily, volume and level features are lazy Polars
+    expressions (group means are ``over`` the calendar keys), run at once
+    by the multithreaded query engine; the Mann-Kendall trends and the
+    seasonality use the batched kernels of the pandas path. The columns
+    are the same as ``fit_transform`` on the equivalent pandas frame, and
+    the result has the type of ``ts``.
+
+    """
+
+    pl = _import_polars()
+    arrow = not type(ts).__module__.startswith('polars')
+    frame = pl.from_arrow(ts) if arrow else ts
+
+    if tsf.windows or tsf.lag or tsf.cache is not None or tsf.profile or tsf.base_freq is not None:
+        # options of the pandas path only, run by fit_transform (profiling
+        # and cache included) on the converted frame
+        out = pl.from_pandas(tsf.fit_transform(frame.to_pandas()))
+        return out.to_arrow() if arrow else out
+
+    cal = calendar(pd.Series(frame['Date'].to_numpy()), tsf.slice_month, tsf.slice_year)
+    keys = [pl.Series('key_' + step, cal['key_' + step]) for step in 'ymsw']
+
+    means = {}
+    trends = {}
+    feats = {'intraday': [], 'daily': [], 'vol': [], 'trends': [], 'seas': [], 'level': []}
+
+    if tsf.osc:
+        feats['intraday'] = _intraday(pl, tsf)
+
+    if tsf.mult and tsf.diff_vl:
+        feats['daily'] = _daily(pl, tsf)
+
+    if tsf.mult and tsf.vol:
+        feats['vol'] = _levels(pl, tsf, 'Volume', 'vol_', means)
+
+    if tsf.trends or tsf.seas:
+        index = GroupIndex(cal, tsf.steps, get_backend(tsf.backend))
+        close = frame['Close'].cast(pl.Float64).fill_null(np.nan).to_numpy()
+
+    if tsf.trends:
+        feats['trends'] = _trends(pl, tsf, index, close, trends)
+
+    if tsf.seas:
+        feats['seas'] = _seas(pl, tsf, index, trends)
+
+    if tsf.levels:
+        feats['level'] = _levels(pl, tsf, 'Close', 'lvl_', means)
+
+    order = ['intraday', 'daily', 'vol', 'trends', 'seas', 'level'] if tsf.mult else ['intraday', 'level', 'trends', 'seas']
+    features = [e for stage in order for e, _ in feats[stage]]
+    dtypes = {e.meta.output_name(): dtype for stage in order for e, dtype in feats[stage]}
+
+    names = list(dtypes)
+
+    # input columns with missing values are filled with 0, as in end_processing;
+    # features named as an input column replace it
+    inputs = []
+    for name, dtype in frame.schema.items():
+        column = pl.col(name)
+        if name in names:
+            continue
+        if dtype.is_float():
+            column = column.fill_nan(0).fill_null(0)
+        elif dtype.is_numeric():
+            column = column.fill_null(0)
+        inputs.append(column)
+
+    stored = [pl.col(n).fill_nan(0).fill_null(0).cast(dtype) for n, dtype in dtypes.items()]
+
+    out = (frame.lazy()
+                .with_columns(keys)
+                .with_columns(list(means.values()))
+                .select(inputs + features)
+                .with_columns(stored)
+                .select(list(frame.columns) + [n for n in names if n not in frame.columns])
+                .collect())
+
+    return out.to_arrow() if arrow else out
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class RunStats:
+
+    r"""
+    Timings and counters of the stages of one run.
+
+    Every stage appends a record with its name, wall time (``seconds``),
+    ``rows``, number of ``groups`` computed, number of Mann-Kendall tests
+    (``mk_tests``) and the peak of memory allocated during the stage above
+    what was allocated when it started (``memory``, in bytes, traced with
+    ``tracemalloc``). Records are passed to ``callback`` and written to
+    ``logger`` as they are completed.
+
+    """
+
+    def __init__(self, callback=None, logger=None):
+
+        self.callback = callback
+        self.logger = logger
+        self.stages = []
+        self._record = None
+        self._tracing = False
+
+    def start(self):
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+
+    def stop(self):
+
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    @contextmanager
+    def stage(self, name, rows):
+
+        record = {'stage': name, 'rows': rows, 'groups': 0, 'mk_tests': 0}
+        self._record = record
+
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        t = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - t
+            record['memory'] = max(tracemalloc.get_traced_memory()[1] - start, 0)
+            self._record = None
+            self.stages.append(record)
+            self.emit(record)
+
+    def count(self, name, n):
+
+        if self._record is not None:
+            self._record[name] += int(n)
+
+    def emit(self, record):
+
+        if self.callback is not None:
+            self.callback(dict(record))
+
+        if self.logger is not None:
+            self.logger.info("%s: %.4f s, %d rows, %d groups, %d MK tests, %d bytes",
+                             record['stage'], record['seconds'], record['rows'],
+                             record['groups'], record['mk_tests'], record['memory'])
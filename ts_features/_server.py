@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+# Authors: Ivan José dos Reis Filho <ivan.filho@uemg.br>
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+# HTTP status lines of the responses
+status_lines = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+# most rows of features per query, and most answers kept per symbol
+max_rows = 10000
+max_answers = 16
+
+
+class _Symbol:
+
+    # warm state of a symbol: the vectorizer fitted on every row seen, the
+    # appends waiting for it and the answers rendered since the last append
+    def __init__(self, tsf):
+
+        self.tsf = tsf
+        self.pending = []
+        self.flush = None
+        self.answers = {}
+        self.rows = 0
+        # latest date of the bars accepted, fitted or waiting
+        self.last_date = None
+
+    def fit(self, frames):
+
+        ts = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        self.tsf.partial_fit(ts)
+        self.rows += len(ts)
+        self.answers = {}
+
+    def latest(self, n):
+
+        # the open year holds the last rows, closed years are only joined
+        # when more rows are asked for
+        tsf = self.tsf
+        if tsf._open_out is not None and n <= len(tsf._open_out):
+            return tsf._open_out.tail(n)
+
+        return tsf.features_.tail(n)
+
+    def answer(self, n):
+
+        if n not in self.answers:
+            if len(self.answers) >= max_answers:
+                # the oldest answer is dropped
+                del self.answers[next(iter(self.answers))]
+            frame = self.latest(n)
+            self.answers[n] = frame.to_json(orient='split', index=False, date_format='iso').encode()
+
+        return self.answers[n]
+
+
+class FeatureServer:
+
+    r"""
+    Features of many symbols kept warm in memory and served over HTTP.
+
+    Every symbol has its own ``tsf_vectorizer`` (built from ``params``)
+    fitted with ``partial_fit``, so appending bars only recomputes the open
+    year. Appends to a symbol that arrive while it is being fitted are
+    batched into one ``partial_fit``, run in a worker thread; queries wait
+    for the appends sent before them and are answered from the rendered
+    features, which are kept until the next append.
+
+    Requests (JSON bodies and answers), over a Unix socket or localhost:
+
+    - ``POST /append?symbol=S`` with a list of bars (``Date``, ``Open``,
+      ``High``, ``Low``, ``Close``, ``Volume``) returns the rows of ``S``;
+    - ``GET /features?symbol=S&n=1`` returns the features of the last ``n``
+      rows (at most ``max_rows``), as ``{"columns": [...], "data": [[...]]}``;
+    - ``GET /symbols`` returns the symbols and their number of rows.
+
+    """
+
+    def __init__(self, params=None, history=None):
+
+        self.params = dict(params or {})
+        self.symbols = {}
+
+        for symbol, ts in (history or {}).items():
+            state = self._state(symbol)
+            state.fit([ts])
+
+    def _state(self, symbol):
+
+        from ts_features._model import tsf_vectorizer
+
+        if symbol not in self.symbols:
+            self.symbols[symbol] = _Symbol(tsf_vectorizer(**self.params))
+
+        return self.symbols[symbol]
+
+    async def append(self, symbol, bars):
+
+        # bars are checked on their own: appends are fitted in batches, where
+        # the missing columns of a bar would be filled by the other bars, and
+        # against the appends not fitted yet, so that a batch is sorted by Date
+        state = self._state(symbol)
+        dates = state.tsf._check_rows(bars)
+        if len(bars) and state.last_date is not None and dates.iloc[0] < state.last_date:
+            raise ValueError(
+                "New rows must not be older than the rows already appended."
+                )
+
+        done = asyncio.get_event_loop().create_future()
+        last = dates.iloc[-1] if len(bars) else None
+        state.pending.append((bars, done, last))
+        state.last_date = state.last_date if last is None else last
+
+        if state.flush is None:
+            state.flush = asyncio.ensure_future(self._flush(state))
+
+        return await done
+
+    async def _flush(self, state):
+
+        loop = asyncio.get_event_loop()
+        try:
+            while state.pending:
+                batch, state.pending = state.pending, []
+                try:
+                    await loop.run_in_executor(None, state.fit, [bars for bars, _, _ in batch])
+                except Exception as e:
+                    # the batch was not fitted: the next appends follow the
+                    # rows fitted and the appends still waiting
+                    dates = [last for _, _, last in state.pending if last is not None]
+                    state.last_date = dates[-1] if dates else state.tsf._last_date
+                    for _, done, _ in batch:
+                        done.set_exception(e)
+                else:
+                    for _, done, _ in batch:
+                        done.set_result(state.rows)
+        finally:
+            state.flush = None
+
+    async def features(self, symbol, n=1):
+
+        if not 1 <= n <= max_rows:
+            raise ValueError(
+                "The parameter \"n\" should be between 1 and %d." % max_rows
+                )
+
+        if symbol not in self.symbols:
+            raise KeyError(symbol)
+
+        state = self.symbols[symbol]
+        if state.flush is not None:
+            # appends sent before the query are answered first
+            await asyncio.shield(state.flush)
+
+        if state.rows == 0:
+            raise KeyError(symbol)
+
+        return state.answer(n)
+
+    async def request(self, method, target, body):
+
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        try:
+            if url.path == '/symbols' and method == 'GET':
+                return 200, json.dumps({s: state.rows for s, state in self.symbols.items()}).encode()
+
+            if url.path == '/features' and method == 'GET':
+                return 200, await self.features(query['symbol'], int(query.get('n', 1)))
+
+            if url.path == '/append' and method == 'POST':
+                bars = pd.DataFrame(json.loads(body))
+                if 'Date' in bars.columns:
+                    bars['Date'] = pd.to_datetime(bars['Date'])
+                rows = await self.append(query['symbol'], bars)
+                return 200, json.dumps({'rows': rows}).encode()
+
+        except KeyError as e:
+            return 404, json.dumps({'error': "Unknown symbol or missing parameter %s." % e}).encode()
+        except ValueError as e:
+            return 400, json.dumps({'error': str(e)}).encode()
+
+        if url.path in ('/symbols', '/features', '/append'):
+            return 405, json.dumps({'error': "Method %s not allowed." % method}).encode()
+
+        return 404, json.dumps({'error': "Unknown path %s." % url.path}).encode()
+
+    async def handle(self, reader, writer):
+
+        # HTTP/1.1 with keep-alive: one request after the other per connection;
+        # a malformed request is answered 400 and the connection closed, as
+        # the start of the next request is unknown
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+
+                try:
+                    method, target = line.decode('latin-1').split()[:2]
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if not line.strip():
+                            break
+                        name, sep, value = line.decode('latin-1').partition(':')
+                        if not sep:
+                            raise ValueError(line)
+                        headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get('content-length', 0))
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    self._respond(writer, 400, json.dumps({'error': "Malformed request."}).encode())
+                    await writer.drain()
+                    break
+
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.request(method, target, body)
+                self._respond(writer, status, payload)
+                await writer.drain()
+
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _respond(writer, status, payload):
+
+        writer.write(b'HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n'
+                     % (status, status_lines[status].encode(), len(payload)) + payload)
+
+    async def start(self, path=None, host='127.0.0.1', port=8765):
+
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path=path)
+
+        return await asyncio.start_server(self.handle, host=host, port=port)
+
+    async def serve(self, path=None, host='127.0.0.1', port=8765):
+
+        server = await self.start(path, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+async def _connect(path=None, host='127.0.0.1', port=8765):
+
+    if path is not None:
+        return await asyncio.open_unix_connection(path)
+
+    return await asyncio.open_connection(host, port)
+
+
+async def _call(reader, writer, method, target, body=b''):
+
+    writer.write(b'%s %s HTTP/1.1\r\nHost: localhost\r\nContent-Length: %d\r\n\r\n'
+                 % (method.encode(), target.encode(), len(body)) + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+
+    return status, await reader.readexactly(length)
+
+
+async def load_test(symbol, path=None, host='127.0.0.1', port=8765, clients=16,
+                    requests=10000, n=1, append_every=0, bars=None):
+
+    r"""
+    Query the features of ``symbol`` from ``clients`` connections at once.
+
+    ``requests`` queries are sent in total, each connection waiting for an
+    answer before its next query. With ``append_every`` set, every client
+    appends one bar of ``bars`` (a DataFrame, taken in turn) before every
+    ``append_every`` queries. Returns the number of queries, queries per
+    second and the p50/p99 latencies of the queries, in milliseconds.
+
+    """
+
+    latencies = []
+    appends = iter(bars.to_dict('records')) if bars is not None else iter(())
+    lock = asyncio.Lock()
+
+    async def client(count):
+
+        reader, writer = await _connect(path, host, port)
+        try:
+            for i in range(count):
+                if append_every and i % append_every == 0:
+                    async with lock:
+                        bar = next(appends, None)
+                        if bar is not None:
+                            # bars are appended in order
+                            body = json.dumps([bar], default=str).encode()
+                            await _call(reader, writer, 'POST', '/append?symbol=%s' % symbol, body)
+
+                t = time.perf_counter()
+                status, _ = await _call(reader, writer, 'GET', '/features?symbol=%s&n=%d' % (symbol, n))
+                latencies.append(time.perf_counter() - t)
+                if status != 200:
+                    raise ValueError(
+                        "The server answered %d." % status
+                        )
+        finally:
+            writer.close()
+
+    counts = [requests // clients + (i < requests % clients) for i in range(clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in counts if c))
+    elapsed = time.perf_counter() - start
+
+    ms = np.asarray(latencies) * 1000
+
+    return {'queries': len(ms),
+            'queries_per_second': len(ms) / elapsed,
+            'p50_ms': float(np.percentile(ms, 50)),
+            'p99_ms': float(np.percentile(ms, 99))}